@@ -0,0 +1,101 @@
+''' Records the reference results of the design scripts for the benchmark accuracy checks
+
+Runs ChosenTradeOffDesign, FinalDesignFile and the aileron reversal script as they are
+(plots go to a non-interactive backend) and stores their results in
+benchmarks/reference/<script>.npz (aileron.npz for the aileron script).
+
+    python benchmarks/make_reference.py
+'''
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REFERENCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reference")
+
+SCRIPTS = ["FinalDesignFile", "ChosenTradeOffDesign"]
+AILERON_SCRIPT = "Aileron Reversal.py"
+
+# The column buckling loop of FinalDesignFile evaluates the moment list one station past the tip
+# for the last stringer interval (distance_top[-1] = 1). Skip that interval, so the script runs
+# through to the margin checks.
+PATCHES = {
+    "FinalDesignFile": [("for stringer_length in distance_top:", "for stringer_length in distance_top[:-1]:")],
+}
+
+
+def run_script(name):
+    with open(os.path.join(ROOT, name)) as f:
+        source = f.read()
+    for old, new in PATCHES.get(name, []):
+        assert old in source, "Patch for %s does not apply: %s" % (name, old)
+        source = source.replace(old, new)
+
+    namespace = {"__name__": "__main__"}
+    start_time = time.time()
+    exec(compile(source, name, "exec"), namespace)
+    namespace["_runtime"] = time.time() - start_time
+    return namespace
+
+
+def reference_arrays(ns):
+    # Stations as used by the deflection and margin loops
+    n_points = ns["n_points"]
+    y = [i * ns["b"] / (2 * n_points) for i in range(n_points)]
+    stations = [ns["MomentInertiaWingBox"](y_i) for y_i in y]
+
+    ref = {
+        "y": np.array(y),
+        "M": np.array(ns["M"]),
+        "V": np.array(ns["V"]),
+        "T": np.array(ns["T"]),
+        "ixx": np.array([s[0] for s in stations]),
+        "z_na": np.array([s[1] for s in stations]),
+        "J": np.array([ns["J_y"](y_i) for y_i in y]),
+        "dvdy": np.array(ns["dvdy"]),
+        "v": np.array(ns["v"]),
+        "phi": np.array(ns["phi"]),
+        "shear_buckling": np.array(ns["ShearStressCheck"]),
+        "compressive_buckling": np.array(ns["CompressiveBucklingCheck"]),
+        "tensile": np.array(ns["TensileCheck"]),
+        "crack": np.array(ns["bot_m_s_sigma"]),
+        "mass": np.array(ns["Mass_wingbox"]),
+        "v_max": np.array(ns["v_max"]),
+        "phi_max": np.array(ns["phi_max"]),
+        "runtime": np.array(ns["_runtime"]),
+    }
+    if "margin_safety_column_buckling" in ns:
+        ref["column_buckling"] = np.array(ns["margin_safety_column_buckling"])
+    return ref
+
+
+def aileron_arrays(ns):
+    return {
+        "y": np.array(ns["y_range"]),
+        "Vr": np.array(ns["Vr"]),
+        "Vd": np.array(ns["Vd"]),
+        "V": np.array(ns["V"], dtype=float),
+        "effectiveness": np.array(ns["Effectiveness"]),
+    }
+
+
+def main():
+    os.makedirs(REFERENCE_DIR, exist_ok=True)
+    for name in SCRIPTS:
+        print("Running", name)
+        ref = reference_arrays(run_script(name))
+        np.savez(os.path.join(REFERENCE_DIR, name + ".npz"), **ref)
+        print("Stored", len(ref), "results of", name, "(%s seconds)" % round(float(ref["runtime"]), 2))
+    print("Running", AILERON_SCRIPT)
+    ref = aileron_arrays(run_script(AILERON_SCRIPT))
+    np.savez(os.path.join(REFERENCE_DIR, "aileron.npz"), **ref)
+    print("Stored", len(ref), "results of", AILERON_SCRIPT)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
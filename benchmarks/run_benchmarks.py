@@ -0,0 +1,309 @@
+''' Benchmark suite: timing and accuracy of every solver stage
+
+Times the loads integration, section properties, deflection/twist, buckling, crack,
+gust, aileron reversal, lifting line, beam finite element, flexible gust response and
+Monte Carlo stages at several grid sizes (for the gust the grid size sets the time
+samples per gust, for the flexible gust the finite elements, both stations / 10), records the scaling curves and checks the results against the
+reference results of the design scripts
+(benchmarks/reference, see make_reference.py) and against the stored baseline.
+Also checks that importing the package stays cheap: no scipy or matplotlib.
+
+    python benchmarks/run_benchmarks.py                     # run and check
+    python benchmarks/run_benchmarks.py --update-baseline   # store new baseline timings/results
+    python benchmarks/run_benchmarks.py --report out.json   # also write the full report
+    python benchmarks/run_benchmarks.py --profile prof.json # per-stage profile of one analysis
+
+Exits with 1 when a stage became slower than the baseline allows, a result moved
+outside its tolerance or the import loads a heavy module.
+'''
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from wingbox import (aileron, fem, gust, gustresponse, liftingline, loads, margins, montecarlo, profiling,  # noqa: E402
+                     section, stiffness, stress)
+from wingbox.analysis import analyse                                                        # noqa: E402
+from wingbox.design import CHOSEN_TRADE_OFF_DESIGN, FINAL_DESIGN                   # noqa: E402
+
+REFERENCE_DIR = os.path.join(BENCH_DIR, "reference")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+
+GRIDS = (500, 5000, 50000)
+DESIGNS = (FINAL_DESIGN, CHOSEN_TRADE_OFF_DESIGN)
+
+# Allowed error relative to the largest reference value of each result
+REFERENCE_TOLERANCES = {
+    "M": 1e-9, "V": 1e-9, "T": 1e-9,
+    "ixx": 1e-9, "z_na": 1e-9, "J": 1e-9,
+    "dvdy": 1e-9, "v": 1e-9, "phi": 1e-9,
+    "shear_buckling": 1e-9, "compressive_buckling": 1e-9, "tensile": 1e-9, "column_buckling": 1e-9,
+    "mass": 1e-5, "v_max": 1e-9, "phi_max": 1e-9,
+}
+# The scripts interpolate the moment for the crack check, the stages use the station values:
+# only the minimum margin is compared.
+MINIMUM_TOLERANCES = {"crack": 5e-3}
+AILERON_TOLERANCES = {"y": 1e-12, "Vr": 1e-9, "Vd": 1e-9, "effectiveness": 1e-9}
+
+BASELINE_RESULT_TOLERANCE = 1e-9    # Relative, for results compared against the stored baseline
+TIME_TOLERANCE = 1.0                # Allowed slow down compared to the baseline [-]
+TIME_FLOOR = 0.005                  # Differences below this are never a regression [s]
+
+MONTE_CARLO_SAMPLES = 100           # Samples of the timed Monte Carlo stage
+LIFTING_LINE_LOAD_FACTORS = np.linspace(-1.5, 3.75, 100)    # Cases of the timed lifting line stage
+
+# Modules that importing the package must not load
+HEAVY_MODULES = ("scipy", "matplotlib")
+IMPORT_CHECK = '''
+import sys, time
+start = time.perf_counter()
+import wingbox
+from wingbox import WingBoxModel, FINAL_DESIGN
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(" ".join(sorted({m.split(".")[0] for m in sys.modules if m.split(".")[0] in %r})))
+'''
+
+
+# ------------------------------------Stages------------------------------------
+
+def stages(design, points):
+    """Callables per stage; the inputs of every stage are prepared outside the timing."""
+    planform = design.planform
+    y = planform.stations(points)
+    dy = planform.half_span / points
+    M, V, T = loads.internal_loads(points)
+    sec = section.section_properties(design, y)
+    mat = design.material
+
+    def section_stage():
+        section.section_properties(design, y)
+        section.wing_box_mass(design)
+
+    def deflection_twist():
+        stiffness.deflection(M, mat.E, sec.ixx, dy)
+        stiffness.twist(T, mat.G, sec.J, dy)
+
+    def buckling():
+        margins.tau_crit(design, sec) / stress.shear_stress(V, T, sec)
+        margins.sigma_crit(design, sec) / stress.compressive_stress(M, sec)
+        margins.column_crit(design) / stress.stringer_stress(M, sec, design.stringer.z_na)
+
+    def crack():
+        margins.sigma_crack(design) / stress.bottom_stress(M, sec)
+
+    def beam():
+        model = fem.BeamModel.from_design(design, points)
+        model.static(q=np.ones((10, points + 1)))
+        model.modes(6)
+
+    return {
+        "loads": lambda: loads.internal_loads(points),
+        "section": section_stage,
+        "deflection_twist": deflection_twist,
+        "buckling": buckling,
+        "crack": crack,
+        "gust": lambda: gust.peak_load_factors(time_steps=max(100, points // 10)),
+        "aileron": lambda: aileron.aileron_analysis(points=points),
+        "fem": beam,
+        "gustresponse": lambda: gustresponse.gust_response(design, elements=max(20, points // 10)),
+        "liftingline": lambda: liftingline.trimmed_loads(LIFTING_LINE_LOAD_FACTORS, 0.77, 228.31, 0.3796, points),
+        "montecarlo": lambda: montecarlo.monte_carlo(design, samples=MONTE_CARLO_SAMPLES, points=points, workers=1),
+    }
+
+
+def baseline_results():
+    """Results of the stages without a script reference, compared against the baseline."""
+    dn_max, H = gust.peak_load_factors()
+    critical = gust.critical_gusts(dn_max, H)
+    y_range, Vr, Vd, V, eff = aileron.aileron_analysis()
+    results = {"gust_" + speed: float(case[0]) for speed, case in critical.items()}
+    results.update({"aileron_Vr": float(Vr[-1]), "aileron_Vd": float(Vd[-1]),
+                    "aileron_effectiveness_max": float(np.max(eff))})
+    frequencies, shapes, kinds = fem.BeamModel.from_design(FINAL_DESIGN, 500).modes(6)
+    results.update({"fem_bending_1": float(frequencies[kinds.index("bending")]),
+                    "fem_torsion_1": float(frequencies[kinds.index("torsion")])})
+    response = gustresponse.gust_response()
+    moment, torque = response.envelope()
+    results.update({"gustresponse_dn_max": float(response.dn_max.max()), "gustresponse_root_moment": float(moment[0]),
+                    "gustresponse_root_torque": float(torque[0])})
+    alpha, Ldistr, Mdistr = liftingline.trimmed_loads(1, 0.77, 228.31, 0.3796)
+    results.update({"liftingline_alpha_1g": float(alpha[0]), "liftingline_root_lift_1g": float(Ldistr[0, 0])})
+    for design in DESIGNS:
+        result = analyse(design, 5000)
+        for key in ("mass", "v_max", "phi_max"):
+            results["%s_%s_5000" % (design.name, key)] = float(result[key])
+        mc = montecarlo.monte_carlo(design, samples=2000, workers=1).summary()
+        results["%s_montecarlo_system" % design.name] = mc["system"]
+    return results
+
+
+# ------------------------------------Timing------------------------------------
+
+def best_time(func, budget=0.2, repeat=3):
+    """Best wall time of `func` [s], repeating it within roughly `budget` seconds."""
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    number = max(1, min(100, int(budget / max(first, 1e-9))))
+    best = first
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def scaling_exponent(grids, times):
+    """Slope of log(time) against log(grid size), fitted over all grid sizes."""
+    return float(np.polyfit(np.log(grids), np.log(times), 1)[0])
+
+
+def run_timings(grids):
+    timings = {}
+    for points in grids:
+        for name, func in stages(FINAL_DESIGN, points).items():
+            timings.setdefault(name, {})[str(points)] = best_time(func)
+            print("  %-18s %7d stations  %10.3f ms" % (name, points, timings[name][str(points)] * 1000))
+    scaling = {name: scaling_exponent(grids, [t[str(p)] for p in grids]) for name, t in timings.items()}
+    return timings, scaling
+
+
+def check_import():
+    """Import time of the package in a fresh interpreter [s], and the heavy modules it loaded."""
+    out = subprocess.run([sys.executable, "-c", IMPORT_CHECK % (HEAVY_MODULES,)], cwd=os.path.dirname(BENCH_DIR),
+                         capture_output=True, text=True, check=True).stdout.splitlines()
+    elapsed, loaded = float(out[0]), out[1].split() if len(out) > 1 else []
+    failures = ["importing wingbox loads %s" % module for module in loaded]
+    return elapsed, failures
+
+
+# ------------------------------------Accuracy------------------------------------
+
+def relative_error(result, ref):
+    result, ref = np.asarray(result, dtype=float), np.asarray(ref, dtype=float)
+    return float(np.max(np.abs(result - ref)) / max(np.max(np.abs(ref)), 1e-300))
+
+
+def check_references():
+    failures, errors = [], {}
+    for design in DESIGNS:
+        path = os.path.join(REFERENCE_DIR, design.name + ".npz")
+        if not os.path.exists(path):
+            failures.append("missing reference %s (run make_reference.py)" % path)
+            continue
+        ref = np.load(path)
+        result = analyse(design, len(ref["y"]))
+        for key in ref.files:
+            if key in REFERENCE_TOLERANCES:
+                err, tol = relative_error(result[key], ref[key]), REFERENCE_TOLERANCES[key]
+            elif key in MINIMUM_TOLERANCES:
+                err, tol = relative_error(np.min(result[key]), np.min(ref[key])), MINIMUM_TOLERANCES[key]
+            else:
+                continue
+            errors["%s.%s" % (design.name, key)] = err
+            if not err <= tol:
+                failures.append("%s %s differs from the reference by %.2e (allowed %.0e)"
+                                % (design.name, key, err, tol))
+
+    path = os.path.join(REFERENCE_DIR, "aileron.npz")
+    if not os.path.exists(path):
+        failures.append("missing reference %s (run make_reference.py)" % path)
+        return errors, failures
+    ref = np.load(path)
+    y_range, Vr, Vd, V, eff = aileron.aileron_analysis(len(ref["y"]), ref["V"])
+    for key, result in (("y", y_range), ("Vr", Vr), ("Vd", Vd), ("effectiveness", eff)):
+        err, tol = relative_error(result, ref[key]), AILERON_TOLERANCES[key]
+        errors["aileron.%s" % key] = err
+        if not err <= tol:
+            failures.append("aileron %s differs from the reference by %.2e (allowed %.0e)" % (key, err, tol))
+    return errors, failures
+
+
+def check_baseline(results, timings, baseline, time_tolerance):
+    failures = []
+    for key, value in baseline.get("results", {}).items():
+        if key not in results:
+            failures.append("result %s missing" % key)
+        elif not relative_error(results[key], value) <= BASELINE_RESULT_TOLERANCE:
+            failures.append("result %s changed: %r -> %r" % (key, value, results[key]))
+
+    for name, per_grid in baseline.get("timings", {}).items():
+        for points, old in per_grid.items():
+            new = timings.get(name, {}).get(points)
+            if new is None:
+                continue
+            if new > old * (1 + time_tolerance) and new - old > TIME_FLOOR:
+                failures.append("stage %s at %s stations slowed down: %.3f ms -> %.3f ms"
+                                % (name, points, old * 1000, new * 1000))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--grids", type=int, nargs="+", default=list(GRIDS), help="numbers of stations")
+    parser.add_argument("--update-baseline", action="store_true", help="store the timings and results as baseline")
+    parser.add_argument("--report", help="write the full report to this JSON file")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE,
+                        help="allowed relative slow down against the baseline")
+    parser.add_argument("--no-timing-check", action="store_true", help="only check the results")
+    parser.add_argument("--profile", metavar="PATH",
+                        help="profile one analysis per grid size and design, and write the profile to PATH")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        with profiling.profile(memory=True):
+            for points in args.grids:
+                for design in DESIGNS:
+                    analyse(design, points)
+        profiling.export(args.profile)
+        print(profiling.summary())
+        return 0
+
+    print("Timing stages")
+    timings, scaling = run_timings(args.grids)
+    print("Scaling exponents:", ", ".join("%s %.2f" % item for item in scaling.items()))
+
+    import_time, import_failures = check_import()
+    print("Import time %.1f ms" % (import_time * 1000))
+
+    print("Checking results")
+    reference_errors, failures = check_references()
+    failures += import_failures
+    results = baseline_results()
+
+    report = {"grids": args.grids, "import_time": import_time, "timings": timings, "scaling": scaling,
+              "reference_errors": reference_errors, "results": results}
+
+    if args.update_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump({"timings": timings, "results": results}, f, indent=2, sort_keys=True)
+        print("Baseline stored in", BASELINE_FILE)
+    elif os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+        if args.no_timing_check:
+            baseline.pop("timings", None)
+        failures += check_baseline(results, timings, baseline, args.time_tolerance)
+
+    report["failures"] = failures
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    for failure in failures:
+        print("FAIL:", failure)
+    print("OK" if not failures else "%d regression(s)" % len(failures))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from wingbox.design import CHOSEN_TRADE_OFF_DESIGN, FINAL_DESIGN
+
+SPREAD = (0.8, 1.25)            # Default range of the random scale factors
+
+
+def _scaled(schedule, factors):
+    """Thickness schedule with the start and end thickness of every segment times factors (segments x 2)."""
+    return replace(schedule, segments=tuple((end, a * f_a, b * f_b)
+                                            for (end, a, b), (f_a, f_b) in zip(schedule.segments, factors)))
+
+
+def make_variants(n, seed, bases=(FINAL_DESIGN, CHOSEN_TRADE_OFF_DESIGN), per_segment=False, spread=SPREAD):
+    """n designs named v0, v1, ..., taking turns over `bases`, with the sheet thicknesses, the
+    stringer t and h and the spar flange width scaled by random factors within `spread`.
+
+    A thickness schedule gets one factor, or with `per_segment` one per segment end.
+    """
+    rng = np.random.default_rng(seed)
+    out = []
+    for i in range(n):
+        base = bases[i % len(bases)]
+        schedules = {}
+        for name in ("t_sheet_spar", "t_sheet_hor_top", "t_sheet_hor_bottom"):
+            schedule = getattr(base, name)
+            shape = (len(schedule.segments), 2)
+            factors = rng.uniform(*spread, shape) if per_segment else np.full(shape, rng.uniform(*spread))
+            schedules[name] = _scaled(schedule, factors)
+        t, h, w = rng.uniform(*spread, 3)
+        stringer = replace(base.stringer, t_stringer=base.stringer.t_stringer * t,
+                           h_stringer=base.stringer.h_stringer * h)
+        out.append(replace(base, name="v%d" % i, stringer=stringer, w_sides_spar=base.w_sides_spar * w, **schedules))
+    return out
+
+
+@pytest.fixture(scope="session")
+def variants():
+    """make_variants, for the tests that need a sample of designs."""
+    return make_variants
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from wingbox import archive as archives
+from wingbox.archive import Archive, ArchiveWriter
+from wingbox.model import WingBoxModel
+
+POINTS = 100
+SPREAD = (0.8, 1.4)             # Wide enough for a few designs to meet every margin
+
+
+@pytest.fixture(scope="module")
+def models(variants):
+    return lambda n: [WingBoxModel(design, POINTS) for design in variants(n, 11, spread=SPREAD)]
+
+
+@pytest.mark.parametrize("complete", [0, 1])
+def test_interrupted_flush_leaves_the_last_complete_chunk(tmp_path, monkeypatch, complete, models):
+    path = str(tmp_path / "sweep.wba")
+    rows = models(2 * complete + 4)
+    kept = rows[:2 * complete] + rows[-2:]
+    writer = ArchiveWriter(path, POINTS, chunk=2)
+    for model in rows[:2 * complete]:
+        writer.append(model)
+
+    def interrupted(*args):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(archives, "_write_json", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        for model in rows[2 * complete:2 * complete + 2]:
+            writer.append(model)
+    monkeypatch.undo()
+    if complete:
+        assert len(Archive(path)) == 2 and len(Archive(path).zonemap) == 1
+    else:
+        assert not (tmp_path / "sweep.wba" / "manifest.json").exists()
+
+    with ArchiveWriter(path, POINTS, chunk=2) as writer:
+        for model in rows[-2:]:
+            writer.append(model)
+    archive = Archive(path)
+    assert len(archive) == len(kept) and archive.zonemap.shape[0] == len(kept) // 2
+    assert [archive.design(row).name for row in range(len(kept))] == [model.design.name for model in kept]
+    masses = [model.summary()["mass"] for model in kept]
+    assert archive.query([("mass", ">=", 0)], order_by="mass", limit=1) == [int(np.argmin(masses))]
+    for row, model in enumerate(kept):
+        assert archive.scalars(row)["mass"] == masses[row]
+        np.testing.assert_array_equal(archive.array("v", row), model.results()["v"])
+    for chunk in range(len(kept) // 2):
+        low, high = archive.zonemap[chunk, archive.columns.index("mass")]
+        assert low == min(masses[2 * chunk:2 * chunk + 2]) and high == max(masses[2 * chunk:2 * chunk + 2])
+
+
+@pytest.fixture(scope="module")
+def stored(tmp_path_factory, models):
+    path = str(tmp_path_factory.mktemp("archive") / "sweep.wba")
+    rows = models(11)
+    with ArchiveWriter(path, POINTS, chunk=4) as writer:
+        for model in rows:
+            writer.append(model)
+    return Archive(path), rows
+
+
+def test_round_trip_is_exact(stored):
+    archive, rows = stored
+    assert len(archive) == len(rows)
+    for row, model in enumerate(rows):
+        assert archive.design(row) == model.design
+        scalars = archive.scalars(row)
+        for key, value in model.summary().items():
+            assert scalars[key] == value
+        results = model.results()
+        for name in archives.ARRAYS:
+            np.testing.assert_array_equal(archive.array(name, row), results[name])
+
+
+def test_compression_is_lossless_for_special_values():
+    block = np.array([[0.0, -0.0, np.inf, -np.inf, np.nan, 1e-308, 5e-324, 1.5]] * 3)
+    restored = archives._decompress(archives._compress(block), block.shape)
+    np.testing.assert_array_equal(restored.view("<i8"), block.view("<i8"))
+
+
+@pytest.mark.parametrize("conditions, order_by, descending, limit", [
+    ([("min_shear_buckling", ">=", 1)], "mass", False, 3),
+    ([("mass", "<", 2100), ("w_sides_spar", ">", 0.04)], "v_percentage", True, None),
+    ([], "phi_max", False, 1),
+    ([("min_crack", "<", 1)], None, False, None),
+])
+def test_query_matches_brute_force(stored, conditions, order_by, descending, limit):
+    archive, rows = stored
+    table = [dict(model.summary(), **archives.design_parameters(model.design)) for model in rows]
+    matches = [i for i, row in enumerate(table)
+               if all(archives.OPERATORS[op](row[name], value) for name, op, value in conditions)]
+    if order_by is not None:
+        matches.sort(key=lambda i: table[i][order_by], reverse=descending)
+    assert list(archive.query(conditions, order_by, descending, limit)) == matches[:limit]
+
+
+def test_lightest_feasible_matches_brute_force(stored):
+    archive, rows = stored
+    for limit in (5.0, 9.5, 10.0, 1e9):
+        feasible = [(model.summary()["mass"], i) for i, model in enumerate(rows)
+                    if all(model.summary()[key] >= 1 for key in archives.MARGIN_COLUMNS)
+                    and model.summary()["v_percentage"] < limit]
+        assert archives.lightest_feasible(archive, limit) == (min(feasible)[1] if feasible else None)
@@ -0,0 +1,57 @@
+import pytest
+
+from wingbox.__main__ import main
+from wingbox.surrogate import read_results
+
+
+@pytest.fixture
+def sweep_file(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    path.write_text("".join('{"base": "%s", "w_sides_spar": %g}\n' % (base, w)
+                            for base in ("FinalDesignFile", "ChosenTradeOffDesign") for w in (0.03, 0.05, 0.07)))
+    return str(path)
+
+
+def test_screen_uses_the_stations_of_the_calibration(sweep_file, tmp_path, capsys):
+    calibration = str(tmp_path / "screening.json")
+    main(["--sweep", sweep_file, "--calibrate", calibration, "--points", "200"])
+    capsys.readouterr()
+    main(["--sweep", sweep_file, "--screen", calibration])
+    rows = capsys.readouterr().out.splitlines()[1:]
+    assert len(rows) == 6
+    with pytest.raises(ValueError, match="calibration is for 200 stations, not 500"):
+        main(["--sweep", sweep_file, "--screen", calibration, "--points", "500"])
+
+
+def test_screen_mass_options(sweep_file, tmp_path, capsys):
+    calibration = str(tmp_path / "screening.json")
+    main(["--sweep", sweep_file, "--calibrate", calibration, "--points", "200"])
+    capsys.readouterr()
+    main(["--sweep", sweep_file, "--screen", calibration, "--max-mass", "1"])
+    assert all("\trejected: " in row for row in capsys.readouterr().out.splitlines()[1:])
+    main(["--sweep", sweep_file, "--screen", calibration, "--prune-heavy"])
+    assert len(capsys.readouterr().out.splitlines()) == 7
+    with pytest.raises(SystemExit):
+        main(["--sweep", sweep_file, "--max-mass", "1"])
+
+
+def test_train_on_a_labelled_table(sweep_file, tmp_path, capsys):
+    calibration, table, model = (str(tmp_path / name) for name in ("screening.json", "table.tsv", "model.npz"))
+    main(["--sweep", sweep_file, "--calibrate", calibration, "--points", "200"])
+    capsys.readouterr()
+    main(["--sweep", sweep_file, "--screen", calibration, "--max-mass", "1800"])
+    output = capsys.readouterr().out
+    analysed = [row.split("\t")[0] for row in output.splitlines()[1:] if row.endswith("\tanalysed")]
+    assert 2 <= len(analysed) < 6
+    with open(table, "w") as f:
+        f.write(output)
+    assert sorted(read_results(table)) == sorted(analysed)
+    main(["--sweep", sweep_file, "--results", table, "--train", model])
+    assert "Trained on %d designs" % len(analysed) in capsys.readouterr().out
+
+
+def test_train_needs_evaluated_designs(sweep_file, tmp_path, capsys):
+    calibration = str(tmp_path / "screening.json")
+    main(["--sweep", sweep_file, "--calibrate", calibration, "--points", "200"])
+    with pytest.raises(ValueError, match="0 design\\(s\\) of .* went through the full model"):
+        main(["--sweep", sweep_file, "--screen", calibration, "--max-mass", "1", "--train", str(tmp_path / "m.npz")])
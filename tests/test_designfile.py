@@ -0,0 +1,37 @@
+import pytest
+
+from wingbox.designfile import DesignError, design_from_dict, load_designs
+
+
+def test_top_layout_needs_two_stringers_per_interval():
+    layout = {"distance": [0.6, 1], "stringers": [[0.1, 0.1], [0.2, 0], [0.3, 0]]}
+    with pytest.raises(DesignError, match="stringers_top: interval 1 has 1 stringer"):
+        design_from_dict({"base": "FinalDesignFile", "stringers_top": layout})
+    # A single stringer is fine on the bottom sheet
+    design_from_dict({"base": "FinalDesignFile", "stringers_bot": layout})
+
+
+def test_top_layout_covers_every_rib_bay():
+    layout = {"distance": [0.3, 0.6], "stringers": [[0.1, 0.1], [0.2, 0.2], [0.3, 0.3]]}
+    with pytest.raises(DesignError, match="stringers_top: 0 stringer"):
+        design_from_dict({"base": "FinalDesignFile", "stringers_top": layout})
+    # Bottom stringers may end before the tip, and so may top ones beyond the root of the last bay
+    design_from_dict({"base": "FinalDesignFile", "stringers_bot": layout})
+    design_from_dict({"base": "FinalDesignFile", "stringers_top": dict(layout, distance=[0.3, 0.95])})
+
+
+@pytest.mark.parametrize("base", [5, None, ["FinalDesignFile"]])
+def test_base_must_be_a_name_or_an_object(base):
+    with pytest.raises(DesignError, match="base: expected a preset name"):
+        design_from_dict({"base": base})
+
+
+def test_unnamed_variants_get_unique_names(tmp_path):
+    path = tmp_path / "sweep.jsonl"
+    path.write_text('{"base": "FinalDesignFile", "w_sides_spar": 0.04}\n# comment\n'
+                    '{"base": "FinalDesignFile", "w_sides_spar": 0.06}\n'
+                    '{"base": "FinalDesignFile", "name": "mine"}\n')
+    assert [d.name for d in load_designs(str(path))] == ["sweep.jsonl:1", "sweep.jsonl:3", "mine"]
+    path = tmp_path / "sweep.json"
+    path.write_text('[{"base": "FinalDesignFile"}, {"base": "ChosenTradeOffDesign"}]')
+    assert [d.name for d in load_designs(str(path))] == ["sweep.json[0]", "sweep.json[1]"]
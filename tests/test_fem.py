@@ -0,0 +1,53 @@
+from math import pi, sqrt
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from wingbox.design import FINAL_DESIGN
+from wingbox.fem import PHI, W, BeamModel, polar_inertia
+from wingbox.section import box_properties
+
+LENGTH, EI, GJ, MASS, INERTIA = 10.0, 2e7, 5e6, 30.0, 2.0
+
+
+@pytest.fixture(scope="module")
+def cantilever():
+    n = 100
+    return BeamModel(np.linspace(0, LENGTH, n + 1), np.full(n, EI), np.full(n, GJ), np.full(n, MASS),
+                     np.full(n, INERTIA))
+
+
+def test_uniform_cantilever_statics(cantilever):
+    w, _, _ = cantilever.static(q=np.full(cantilever.nodes, 100.0))
+    _, _, phi = cantilever.static(t=np.full(cantilever.nodes, 50.0))
+    assert w[0, -1] == pytest.approx(100.0 * LENGTH ** 4 / (8 * EI), rel=1e-8)
+    assert phi[0, -1] == pytest.approx(50.0 * LENGTH ** 2 / (2 * GJ), rel=1e-8)
+
+
+def test_uniform_cantilever_frequencies(cantilever):
+    frequencies, shapes, kinds = cantilever.modes(4)
+    bending = frequencies[[i for i, kind in enumerate(kinds) if kind == "bending"]]
+    torsion = frequencies[[i for i, kind in enumerate(kinds) if kind == "torsion"]]
+    assert bending[0] == pytest.approx(1.875104 ** 2 * sqrt(EI / (MASS * LENGTH ** 4)) / (2 * pi), rel=1e-5)
+    assert torsion[0] == pytest.approx(pi / (2 * LENGTH) * sqrt(GJ / INERTIA) / (2 * pi), rel=1e-4)
+    assert np.all(shapes[:, 0] == 0)                    # Clamped root
+
+
+def test_closed_box_polar_inertia():
+    # Thin walled rectangular box of one thickness, no stringers: the Ixx the beam bends with (each wall
+    # counted once) plus the Izz of the walls about the box centre
+    h, w, t = 0.4, 1.2, 0.002
+    ixx, z_na, area, J = box_properties(h, w, t, t, t, 0, 0, 0.0, 0.0, 0.0, 0.0)
+    sec = SimpleNamespace(h_spar=h, w_sheet=w, t_spar=t, t_top=t, t_bot=t, z_na=z_na, ixx=ixx)
+    assert polar_inertia(sec) == pytest.approx(ixx + t * w ** 3 / 6 + t * h * w ** 2 / 2, rel=1e-12)
+    assert polar_inertia(sec) < 1.1 * (t * h ** 3 / 6 + t * w * h ** 2 / 2 + t * w ** 3 / 6 + t * h * w ** 2 / 2)
+
+
+def test_banded_solve_matches_dense():
+    beam = BeamModel.from_design(FINAL_DESIGN, elements=40)
+    F = beam.load_vector(q=np.linspace(2e4, 0, beam.nodes), t=np.full(beam.nodes, 1e3))
+    dense = np.linalg.solve(beam.sparse(beam.K).toarray(), F[0, beam.free])
+    u = beam.solve(F)[0]
+    np.testing.assert_allclose(u.reshape(-1)[beam.free], dense, rtol=1e-8, atol=1e-14)
+    assert u[-1, W] > 0 and u[-1, PHI] != 0
@@ -0,0 +1,23 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from wingbox import gust
+from wingbox.design import FINAL_DESIGN
+from wingbox.gustresponse import gust_response
+
+
+def test_stiff_wing_gives_the_rigid_load_factors():
+    material = FINAL_DESIGN.material
+    stiff = replace(FINAL_DESIGN, material=replace(material, E=1000 * material.E, G=1000 * material.G))
+    response = gust_response(stiff, modes=1, elements=20, steps_per_period=10)
+    dn_max, H = gust.peak_load_factors()
+    np.testing.assert_array_equal(response.H, H)
+    np.testing.assert_allclose(response.dn_max, dn_max, rtol=0.02)
+    assert response.dn_max.max() == pytest.approx(dn_max.max(), rel=5e-3)
+
+
+def test_unstable_cases_raise():
+    with pytest.raises(ValueError, match="aeroelastically unstable with 6 modes"):
+        gust_response(modes=6, elements=20)
@@ -0,0 +1,50 @@
+from math import pi, radians, sqrt, tan
+
+import numpy as np
+import pytest
+
+from wingbox import liftingline, loads
+from wingbox.design import FINAL_DESIGN
+from wingbox.geometry import Planform
+from wingbox.liftingline import trimmed_loads
+from wingbox.model import WingBoxModel
+
+
+def test_given_distributions_are_not_scaled_by_the_load_factor():
+    Ldistr, Mdistr = loads.load_distribution(500)
+    n = loads.LoadCase().load_factor
+    stored = loads.internal_loads(500)
+    given = loads.internal_loads(500, distributions=(n * Ldistr, Mdistr))
+    np.testing.assert_allclose(given[0], stored[0])
+    np.testing.assert_allclose(given[1], stored[1])
+
+
+def test_trimmed_loads_scale_with_the_load_factor_once():
+    _, Ldistr, Mdistr = trimmed_loads(load_factor=[1, 2], mach=0.77, V=228.31, rho=0.3796)
+    lift = [WingBoxModel(FINAL_DESIGN, distributions=(Ldistr[i], Mdistr[i])).loads[1][0] for i in range(2)]
+    weight = loads.internal_loads(500, distributions=(0 * Ldistr[0], Mdistr[0]))[1][0]
+    # Root shear from the lift alone (the weight relief does not depend on the load factor)
+    np.testing.assert_allclose(lift[1] - weight, 2 * (lift[0] - weight), rtol=1e-6)
+
+
+def test_trimmed_lift_carries_the_load_factor_times_the_weight():
+    weight = liftingline.AeroData().weight
+    y = np.linspace(0, FINAL_DESIGN.planform.half_span, 500)               # Stations of the distributions
+    alpha, Ldistr, Mdistr = trimmed_loads(load_factor=[1, 2.5, -1], mach=0.77, V=228.31, rho=0.3796)
+    np.testing.assert_allclose(2 * np.trapezoid(Ldistr, y, axis=1), np.array([1, 2.5, -1]) * weight, rtol=1e-3)
+    assert alpha[0] < alpha[1]
+
+    # Close to the stored cruise distribution inboard, where the wing box loads are largest
+    stored, _ = loads.load_distribution(500)
+    inboard = y < 0.4 * FINAL_DESIGN.planform.half_span
+    np.testing.assert_allclose(Ldistr[0, inboard], stored[inboard], rtol=0.03)
+
+
+def test_lift_slope_is_close_to_datcom():
+    planform, mach = Planform(), 0.77
+    y, slope = liftingline.lift_slope_distribution(mach, 500, planform)
+    S = planform.b * (planform.C_r + planform.C_t) / 2
+    A, beta = planform.b ** 2 / S, sqrt(1 - mach ** 2)
+    tan_half_chord = tan(radians(planform.sweep_quarter_chord)) - (1 - planform.taper) / (A * (1 + planform.taper))
+    datcom = 2 * pi * A / (2 + sqrt(A ** 2 * beta ** 2 / 0.95 ** 2 * (1 + tan_half_chord ** 2 / beta ** 2) + 4))
+    assert 2 * np.trapezoid(slope[0], y) / S == pytest.approx(datcom, rel=0.025)
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from wingbox import montecarlo
+from wingbox.design import CHOSEN_TRADE_OFF_DESIGN, FINAL_DESIGN
+from wingbox.margins import Margins
+from wingbox.model import WingBoxModel
+
+POINTS = 100
+
+
+def test_results_do_not_depend_on_the_workers(monkeypatch):
+    monkeypatch.setattr(montecarlo, "BATCH_ELEMENTS", 50 * POINTS)     # 7 batches
+    one, three = (montecarlo.monte_carlo(FINAL_DESIGN, samples=330, points=POINTS, seed=7, workers=workers)
+                  for workers in (1, 3))
+    np.testing.assert_array_equal(one.minimum_margins, three.minimum_margins)
+    for mode in Margins.MODES:
+        np.testing.assert_array_equal(one.station_failures[mode], three.station_failures[mode])
+    assert one.summary() == three.summary()
+    assert 0 < one.system_probability < 1
+
+
+@pytest.mark.parametrize("design", [FINAL_DESIGN, CHOSEN_TRADE_OFF_DESIGN])
+def test_without_scatter_the_probabilities_are_the_nominal_failures(design):
+    result = montecarlo.monte_carlo(design, samples=20, points=POINTS, scatter=montecarlo.Scatter(0, 0, 0, 0, 0, 0),
+                                    workers=1)
+    nominal = WingBoxModel(design, POINTS).margins
+    assert result.probability == {mode: float(failed) for mode, failed in nominal.failures().items()}
+    assert result.system_probability == float(any(nominal.failures().values()))
+    for mode in Margins.MODES:
+        np.testing.assert_array_equal(result.station_probability[mode], getattr(nominal, mode) < 1)
+    np.testing.assert_allclose(result.minimum_margins, [[nominal.minimum()[mode] for mode in Margins.MODES]] * 20,
+                               rtol=1e-12)
@@ -0,0 +1,15 @@
+from wingbox import profiling
+from wingbox.design import FINAL_DESIGN
+from wingbox.model import WingBoxModel
+
+
+def test_reset_keeps_recording_hot_functions():
+    with profiling.profile():
+        WingBoxModel(FINAL_DESIGN, 200).summary()
+        profiling.reset()
+        assert profiling.report() == {"stages": {}, "functions": {}}
+        WingBoxModel(FINAL_DESIGN, 200).summary()
+        report = profiling.report()
+    profiling.reset()
+    assert report["functions"]
+    assert report["stages"]
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from wingbox.design import CHOSEN_TRADE_OFF_DESIGN, FINAL_DESIGN
+from wingbox.model import evaluate_designs
+from wingbox.screening import MARGINS, QUANTITIES, calibrate, feasible, four_plate, screen_designs
+
+
+@pytest.fixture(scope="module")
+def calibration(variants):
+    return calibrate(variants(100, 1))
+
+
+@pytest.fixture(scope="module")
+def candidates(variants):
+    designs = variants(800, 2)
+    return designs, {design.name: summary for design, summary in evaluate_designs(designs)}
+
+
+def test_bounds_hold_on_held_out_designs(calibration, candidates):
+    designs, truth = candidates
+    lower, upper = calibration.bounds(four_plate(designs))
+    for key in QUANTITIES:
+        actual = np.array([truth[design.name][key] for design in designs])
+        assert np.all((lower[key] <= actual) & (actual <= upper[key])), key
+
+
+@pytest.mark.parametrize("max_deflection, reason", [(None, "shear_buckling"), (9.0, "deflection")])
+def test_no_feasible_design_is_rejected(calibration, candidates, max_deflection, reason):
+    designs, truth = candidates
+    stages = {design.name: stage for design, _, stage in
+              screen_designs(designs, calibration, max_deflection=max_deflection, batch=300)}
+    assert "rejected: infeasible: " + reason in stages.values()
+    assert any(feasible(summary, max_deflection) for summary in truth.values())
+    for name, stage in stages.items():
+        if feasible(truth[name], max_deflection):
+            assert stage == "analysed", name
+
+
+def test_lightest_finds_the_lightest_feasible_design(calibration, candidates):
+    designs, truth = candidates
+    rows = list(screen_designs(designs, calibration, lightest=True, batch=300))
+    assert len(rows) == len(designs)
+    analysed = [(summary["mass"], design.name) for design, summary, stage in rows
+                if stage == "analysed" and feasible(summary)]
+    best = min((summary["mass"], name) for name, summary in truth.items() if feasible(summary))
+    assert min(analysed) == best
+    for _, summary, _ in rows:
+        assert list(summary) == list(truth[designs[0].name])
+        assert all(key in summary for key in MARGINS)
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from wingbox import service as services
+from wingbox.service import AnalysisService, evaluate_remote, make_server
+
+
+def test_designs_differing_only_in_name_share_an_evaluation():
+    service = AnalysisService(points=100, workers=2)
+    try:
+        results = service.evaluate([{"base": "FinalDesignFile", "name": "a"},
+                                    {"base": "FinalDesignFile", "name": "b"}])
+        again = service.evaluate([{"base": "FinalDesignFile", "name": "c"}])
+        status = service.status()
+    finally:
+        service.close()
+    assert [r["name"] for r in results + again] == ["a", "b", "c"]
+    assert results[0]["summary"] == results[1]["summary"] == again[0]["summary"]
+    assert status["evaluated"] == 1
+    assert status["coalesced"] + status["from_cache"] == 2
+
+
+def test_spanwise_results_are_not_cached():
+    service = AnalysisService(points=100, workers=1)
+    try:
+        result, = service.evaluate([{"base": "FinalDesignFile"}], spanwise=True)
+        status = service.status()
+    finally:
+        service.close()
+    assert len(result["spanwise"]["v"]) == 100
+    assert status["cached"] == 0
+
+
+@pytest.fixture
+def url():
+    service = AnalysisService(points=100, workers=1, max_pending=2)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://%s:%d" % server.server_address[:2]
+    server.shutdown()
+    server.server_close()
+    service.close()
+
+
+def test_http_answers(url, tmp_path, monkeypatch):
+    design = {"base": "FinalDesignFile", "w_sides_spar": 0.04}
+    result, = evaluate_remote([design], url)
+    assert result["summary"]["mass"] > 0
+
+    for points in (1, services.MAX_POINTS + 1, 2.5):
+        with pytest.raises(RuntimeError, match="answered 400: points: expected an integer from 2 to"):
+            evaluate_remote([design], url, points=points)
+    (tmp_path / "variant.json").write_text('{"base": "FinalDesignFile"}')
+    for base in (str(tmp_path / "variant.json"), "variant.json"):
+        with pytest.raises(RuntimeError, match="answered 400: .*design files are not allowed"):
+            evaluate_remote([{"base": base}], url)
+    with pytest.raises(RuntimeError, match="answered 400: designs\\[0\\]: base: expected a preset name"):
+        evaluate_remote([{"base": 5}], url)
+
+    monkeypatch.setattr(services, "MAX_BATCH", 2)
+    with pytest.raises(RuntimeError, match="answered 413: at most 2 designs"):
+        evaluate_remote([design] * 3, url)
+    monkeypatch.undo()
+    with pytest.raises(RuntimeError, match="answered 503: 0 designs pending, 3 more requested"):
+        evaluate_remote([design] * 3, url)
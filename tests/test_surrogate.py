@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from wingbox.design import FINAL_DESIGN
+from wingbox.model import evaluate_designs
+from wingbox.surrogate import TARGETS, Surrogate, confident, read_results
+
+
+def evaluated(designs):
+    return designs, [summary for _, summary in evaluate_designs(designs)]
+
+
+def final_variants(variants, n, seed):
+    """FinalDesignFile with its 12 sheet thicknesses, the stringer t and h and the flange width scaled."""
+    return variants(n, seed, bases=(FINAL_DESIGN,), per_segment=True)
+
+
+@pytest.fixture(scope="module")
+def held_out(variants):
+    return evaluated(final_variants(variants, 300, 99))
+
+
+@pytest.mark.parametrize("samples", [10, 20, 150])
+def test_held_out_verdicts_and_coverage(samples, held_out, variants):
+    surrogate = Surrogate.fit(*evaluated(final_variants(variants, samples, samples)))
+    designs, truth = held_out
+    prediction, std = surrogate.predict(designs)
+    sure = confident(prediction, std)
+    for key in TARGETS:
+        actual = np.array([summary[key] for summary in truth])
+        error = np.abs(np.log(actual / prediction[key]))
+        assert np.mean(error <= 2 * std[key]) >= 0.85, key
+        if key.startswith("min_"):
+            assert not np.any(sure & ((actual >= 1) != (prediction[key] >= 1))), key
+
+
+def test_too_few_samples_are_never_confident(held_out, variants):
+    surrogate = Surrogate.fit(*evaluated(final_variants(variants, 10, 10)))
+    assert surrogate.samples <= surrogate.rank + 1
+    prediction, std = surrogate.predict(held_out[0][:20])
+    assert not np.any(confident(prediction, std))
+
+
+def test_save_and_load(tmp_path, variants):
+    surrogate = Surrogate.fit(*evaluated(final_variants(variants, 30, 30)))
+    surrogate.save(tmp_path / "surrogate.npz")
+    loaded = Surrogate.load(tmp_path / "surrogate.npz")
+    designs = final_variants(variants, 5, 5)
+    for a, b in zip(surrogate.predict(designs), loaded.predict(designs)):
+        for key in TARGETS:
+            np.testing.assert_array_equal(a[key], b[key])
+
+
+def test_read_results_rejects_duplicate_names(tmp_path):
+    path = tmp_path / "table.tsv"
+    rows = [("name",) + TARGETS] + [(name,) + (value,) * len(TARGETS) for name, value in zip("aba", "123")]
+    path.write_text("".join("\t".join(row) + "\n" for row in rows))
+    with pytest.raises(ValueError, match="'a' appears more than once"):
+        read_results(str(path))
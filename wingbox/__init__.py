@@ -0,0 +1,75 @@
+''' Wing box analysis: loads, section properties, deflection and twist, stresses and margins of safety
+
+The stages of the design scripts (FinalDesignFile, ChosenTradeOffDesign, ...) as
+vectorised functions that can be evaluated on any number of span stations.
+
+Importing the package is cheap and has no side effects: the submodules and the
+names below are only loaded when first used, and scipy and matplotlib are only
+imported by the functions that need them.
+
+    from wingbox import WingBoxModel, FINAL_DESIGN
+    WingBoxModel(FINAL_DESIGN).summary()
+'''
+import importlib
+
+# name -> submodule defining it
+_EXPORTS = {
+    "Planform": "geometry",
+    "Material": "design",
+    "HatStringer": "design",
+    "StringerLayout": "design",
+    "ThicknessSchedule": "design",
+    "WingBoxDesign": "design",
+    "AL2024": "design",
+    "AL4047": "design",
+    "FINAL_DESIGN": "design",
+    "CHOSEN_TRADE_OFF_DESIGN": "design",
+    "LoadCase": "loads",
+    "internal_loads": "loads",
+    "Section": "section",
+    "section_properties": "section",
+    "wing_box_mass": "section",
+    "Margins": "margins",
+    "WingBoxModel": "model",
+    "evaluate_designs": "model",
+    "DesignError": "designfile",
+    "load_design": "designfile",
+    "load_designs": "designfile",
+    "dump_design": "designfile",
+    "analyse": "analysis",
+    "BeamModel": "fem",
+    "GustResponse": "gustresponse",
+    "gust_response": "gustresponse",
+    "spanwise_loads": "liftingline",
+    "trimmed_loads": "liftingline",
+    "Scatter": "montecarlo",
+    "monte_carlo": "montecarlo",
+    "Surrogate": "surrogate",
+    "screen": "surrogate",
+    "Calibration": "screening",
+    "screen_designs": "screening",
+    "AnalysisService": "service",
+    "Archive": "archive",
+    "ArchiveWriter": "archive",
+}
+
+_SUBMODULES = ("aileron", "analysis", "archive", "design", "designfile", "fem", "geometry", "gust", "gustresponse",
+               "liftingline", "loads", "margins", "model", "montecarlo", "plotting", "profiling", "screening", "section",
+               "service", "stiffness", "stress", "surrogate")
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module("wingbox." + _EXPORTS[name]), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module("wingbox." + name)
+    else:
+        raise AttributeError("module 'wingbox' has no attribute %r" % name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | set(_SUBMODULES))
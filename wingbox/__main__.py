@@ -0,0 +1,179 @@
+''' python -m wingbox [final|chosen|design file] [--points N] [--plot]: the output of the design scripts
+
+    python -m wingbox designs/TradeOffDesign1.json
+    python -m wingbox --sweep variants.jsonl      # one line of results per variant
+    python -m wingbox --sweep variants.jsonl --train surrogate.npz                      # also train a surrogate
+    python -m wingbox --sweep variants.jsonl --results table.tsv --train surrogate.npz  # on stored results
+    python -m wingbox --sweep candidates.jsonl --surrogate surrogate.npz  # solver only for uncertain ones
+    python -m wingbox --sweep variants.jsonl --calibrate screening.json  # calibrate the four-plate screen
+    python -m wingbox --sweep candidates.jsonl --screen screening.json   # full model only for survivors
+    python -m wingbox --sweep candidates.jsonl --screen screening.json --prune-heavy --max-deflection 12
+    python -m wingbox --serve --port 8765 --workers 4   # keep running and answer requests (wingbox.service)
+    python -m wingbox --sweep variants.jsonl --archive sweep.wba  # also keep all results (wingbox.archive)
+    python -m wingbox --lightest sweep.wba --max-deflection 5     # lightest design meeting all margins
+'''
+import argparse
+import time
+from collections import Counter
+
+from wingbox.design import CHOSEN_TRADE_OFF_DESIGN, FINAL_DESIGN
+from wingbox.designfile import load_design, load_designs
+from wingbox.model import WingBoxModel, evaluate_designs
+
+DESIGNS = {"final": FINAL_DESIGN, "chosen": CHOSEN_TRADE_OFF_DESIGN}
+
+CHECKS = (("shear_buckling", "Shear stress"), ("compressive_buckling", "Compression buckling"),
+          ("tensile", "Tensile stress"), ("crack", "Crack stress"), ("column_buckling", "Column buckling"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m wingbox", description=__doc__.split("\n")[0])
+    parser.add_argument("design", nargs="?", default="final", help="final, chosen or a design file")
+    parser.add_argument("--points", type=int, help="number of span stations (500, --screen: as calibrated)")
+    parser.add_argument("--plot", action="store_true", help="show the margin and deflection plots")
+    parser.add_argument("--sweep", metavar="PATH", help="evaluate every variant of a sweep file or directory")
+    parser.add_argument("--surrogate", metavar="MODEL", help="predict the sweep with a trained surrogate model")
+    parser.add_argument("--train", metavar="MODEL", help="train a surrogate model on the sweep and save it")
+    parser.add_argument("--results", metavar="TABLE", help="stored results of the sweep to train on")
+    parser.add_argument("--screen", metavar="CALIBRATION", help="screen the sweep with the four-plate model first")
+    parser.add_argument("--calibrate", metavar="CALIBRATION", help="calibrate the four-plate screen on the sweep")
+    parser.add_argument("--max-mass", type=float, help="with --screen: reject designs surely heavier [kg]")
+    parser.add_argument("--prune-heavy", action="store_true",
+                        help="with --screen: reject designs surely heavier than the lightest feasible one so far")
+    parser.add_argument("--archive", metavar="PATH", help="store the sweep results in a result archive")
+    parser.add_argument("--lightest", metavar="ARCHIVE", help="lightest design of an archive meeting all margins")
+    parser.add_argument("--max-deflection", type=float, help="tip deflection limit [%%span] (--lightest: 5)")
+    parser.add_argument("--serve", action="store_true", help="run the analysis service on localhost")
+    parser.add_argument("--port", type=int, default=8765, help="port of the analysis service")
+    parser.add_argument("--workers", type=int, default=4, help="worker threads of the analysis service")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        from wingbox.service import serve
+        serve(port=args.port, points=args.points or 500, workers=args.workers)
+        return
+
+    if (args.max_mass is not None or args.prune_heavy) and not args.screen:
+        parser.error("--max-mass and --prune-heavy need --screen")
+    if args.sweep:
+        if args.calibrate:
+            calibrate(args.sweep, args.points or 500, args.calibrate)
+        elif args.train and args.results:
+            train(args.sweep, args.results, args.train)
+        else:
+            sweep(args.sweep, args.points, args.surrogate, args.train, args.archive, args.screen,
+                  args.max_deflection, args.max_mass, args.prune_heavy)
+        return
+    if args.surrogate or args.train or args.results or args.archive or args.screen or args.calibrate:
+        parser.error("--surrogate, --train, --results, --archive, --screen and --calibrate need --sweep")
+    if args.lightest:
+        lightest(args.lightest, 5.0 if args.max_deflection is None else args.max_deflection)
+        return
+
+    start_time = time.time()
+    design = DESIGNS[args.design] if args.design in DESIGNS else load_design(args.design)
+    model = WingBoxModel(design, args.points or 500)
+    failures = model.margins.failures()
+    stats = model.summary()
+
+    for mode, label in CHECKS:
+        print(label, "failure" if failures[mode] else "OK")
+    print(' ')
+    print('The wing box mass is', round(stats["mass"], 2), '[kg]')
+    print('The maximum deflection is', round(stats["v_max"], 4), '[m] or', round(stats["v_percentage"], 3), '[%] of the span.')
+    print('The maximum twist is', round(stats["phi_max"], 4), '[deg]')
+    print("Calculations took %s seconds." % round((time.time() - start_time), 2))
+
+    if args.plot:
+        from wingbox import plotting
+        plotting.plot_margins(model)
+        plotting.plot_deflection(model)
+        plotting.show()
+
+
+def sweep(path, points=None, surrogate=None, train_path=None, archive=None, screen=None, max_deflection=None,
+          max_mass=None, prune_heavy=False):
+    from wingbox import surrogate as surrogates
+    if not screen:
+        points = points or 500
+    # (design, summary, source, model if there is one)
+    if screen:
+        from wingbox.screening import Calibration, screen_designs
+        calibration = Calibration.load(screen)
+        points = points or calibration.points       # screen_designs rejects any other number
+        rows = ((design, stats, source, None) for design, stats, source in
+                screen_designs(load_designs(path), calibration, max_mass, max_deflection, prune_heavy, points))
+    elif surrogate:
+        rows = ((design, stats, source, None) for design, stats, source in
+                surrogates.screen(load_designs(path), surrogates.Surrogate.load(surrogate), points=points))
+    elif archive:
+        rows = ((model.design, model.summary(), None, model) for model in
+                (WingBoxModel(design, points) for design in load_designs(path)))
+    else:
+        rows = ((design, stats, None, None) for design, stats in evaluate_designs(load_designs(path), points))
+    writer = None
+    if archive:
+        from wingbox.archive import ArchiveWriter
+        writer = ArchiveWriter(archive, points)
+    keys = None
+    labelled = surrogate or screen
+    evaluated = []
+    try:
+        for design, stats, source, model in rows:
+            if keys is None:
+                keys = list(stats)
+                print("name", *keys, *(["source"] if labelled else []), sep="\t")
+            print(design.name, *("%.6g" % stats[key] for key in keys), *([source] if labelled else []), sep="\t")
+            solved = source is None or source in surrogates.SOLVED
+            if train_path and solved:
+                evaluated.append((design, stats))
+            if writer is not None and solved:      # Predictions and estimates have no spanwise results
+                writer.append(model or WingBoxModel(design, points))
+    finally:
+        if writer is not None:
+            writer.close()
+    if train_path:
+        if len(evaluated) < 2:
+            raise ValueError("%d design(s) of %s went through the full model, the surrogate needs at least two "
+                             "to train on" % (len(evaluated), path))
+        surrogates.Surrogate.fit(*zip(*evaluated)).save(train_path)
+
+
+def lightest(path, max_deflection):
+    from wingbox.archive import Archive, lightest_feasible
+    archive = Archive(path)
+    row = lightest_feasible(archive, max_deflection)
+    if row is None:
+        print("No design of the %d in %s meets all margins with a tip deflection below %g%% of the span"
+              % (len(archive), path, max_deflection))
+        return
+    stats = archive.scalars(row)
+    print("Lightest design:", archive.design(row).name, "(row %d of %d)" % (row, len(archive)))
+    print('The wing box mass is', round(stats["mass"], 2), '[kg]')
+    print('The maximum deflection is', round(stats["v_max"], 4), '[m] or', round(stats["v_percentage"], 3), '[%] of the span.')
+    print('The maximum twist is', round(stats["phi_max"], 4), '[deg]')
+
+
+def calibrate(path, points, calibration_path):
+    """Calibrate the four-plate screen against the full model on the designs of a sweep."""
+    from wingbox.screening import calibrate as calibrate_screen
+    designs = list(load_designs(path))
+    calibrate_screen(designs, points).save(calibration_path)
+    print("Calibrated on", len(designs), "designs of", path)
+
+
+def train(path, results, train_path):
+    """Train a surrogate on stored results (the table printed by --sweep) of the designs of a sweep."""
+    from wingbox import surrogate as surrogates
+    table = surrogates.read_results(results)
+    designs = list(load_designs(path))
+    duplicates = sorted(name for name, count in Counter(design.name for design in designs).items() if count > 1)
+    if duplicates:
+        raise ValueError("%s: design names appear more than once: %s" % (path, ", ".join(duplicates)))
+    designs = [design for design in designs if design.name in table]
+    surrogates.Surrogate.fit(designs, [table[design.name] for design in designs]).save(train_path)
+    print("Trained on", len(designs), "designs of", results)
+
+
+if __name__ == "__main__":
+    main()
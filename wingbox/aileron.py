@@ -0,0 +1,86 @@
+''' Aileron reversal and divergence speed, and the aileron effectiveness'''
+from dataclasses import dataclass
+
+import numpy as np
+
+from wingbox.geometry import Planform
+from wingbox.profiling import hot
+
+# The aileron script works with the unrounded chords of the previous iterations
+AILERON_PLANFORM = Planform(C_r=3.695625413, C_t=1.107118055, b=24.01371734)
+
+
+@dataclass(frozen=True)
+class AileronData:
+    S: float = 57                       # Aileron effective area [m^2]
+    G: float = 27E9                     # G-modulus [Pa]
+    rho: float = 0.37956556562264265    # Air density at cruise [kg/m^3]
+    dCl_dEpsilon: float = 2.813795732   # [1/rad]
+    dCm_dEpsilon: float = -0.425707     # [1/rad]
+    dCl_dAlpha: float = 6.65802         # [1/rad]
+    y_start: float = 0.75               # Aileron inboard end [%span]
+    y_end: float = 0.95                 # Aileron outboard end [%span]
+    # Box model of the aileron script (thin plates with four hat stringers)
+    t_plate: float = 0.004              # Plate thickness [m]
+    A_stringer: float = 0.000136        # Area hat stringer (10 x 10 x 4 mm) [m^2]
+    h_left: float = 0.09065             # Front spar height [%chord]
+    h_right: float = 0.08116            # Rear spar height [%chord]
+
+
+def box_stiffness(C_y, data=AileronData()):
+    """Torsional stiffness K = G*J [Nm^2/rad] and elastic axis offset e*c [m] of the box.
+
+    J is the constant of the aileron script for a rectangular tube with the mean spar height,
+    2 t^2 (b-2mm)^2 (a-t)^2 / (a t + b t - 2 t^2): the script takes 2 mm off the plate width b
+    where the Bredt-Batho formula has t, which is kept so the results match the script.
+    """
+    t = data.t_plate
+    L_plate = 0.6 * C_y - 0.2 * C_y
+    A_plate = L_plate * t
+    H_left = data.h_left * C_y
+    H_right = data.h_right * C_y
+    a = (H_left + H_right) / 2
+
+    # Centroid, with the datum on the side closest to LE
+    Total_Area = 4 * data.A_stringer + 2 * A_plate + (H_left + H_right) * t
+    Centroid_WingBox = (2 * A_plate * L_plate / 2 + H_left * t * t / 2 + H_right * t * (L_plate - t / 2)
+                        + 2 * data.A_stringer * t + 2 * data.A_stringer * (L_plate - t)) / Total_Area
+    ce = ((0.6 * C_y + Centroid_WingBox) / C_y - 0.25) * C_y
+
+    J = 2 * t ** 2 * (L_plate - 0.002) ** 2 * (a - t) ** 2 / (a * t + L_plate * t - 2 * t ** 2)
+    return data.G * J, ce
+
+
+def reversal_speed(K, C_y, data=AileronData()):
+    """Aileron reversal speed [m/s]"""
+    ratio = 0.5 * data.rho * data.S
+    return np.sqrt((-K * data.dCl_dEpsilon) / (ratio * C_y * data.dCm_dEpsilon * data.dCl_dAlpha))
+
+
+def divergence_speed(K, ce, data=AileronData()):
+    """Divergence speed [m/s]"""
+    return np.sqrt((2 * K) / (data.rho * data.S * ce * data.dCl_dAlpha))
+
+
+def effectiveness(V, Vr, Vd):
+    """Aileron effectiveness at speed(s) V for reversal speed Vr and divergence speed Vd"""
+    V = np.asarray(V, dtype=float)
+    return (1 - (V / Vr) ** 2) / (1 - (V / Vd) ** 2)
+
+
+@hot
+def aileron_analysis(points=20, speeds=None, planform=AILERON_PLANFORM, data=AileronData()):
+    """Reversal and divergence speed along the aileron, and the effectiveness at its last station.
+
+    Returns (y_range, Vr, Vd, V, effectiveness) with `points` stations along the aileron. As in
+    the script (np.arange(0.75, 0.95, 0.01) for 20 stations) the stations are the inboard ends of
+    equal steps, so the last one lies one step inboard of y_end.
+    """
+    y_range = data.y_start + (data.y_end - data.y_start) * np.arange(points) / points
+    C_y = planform.C_r - planform.C_r * (1 - planform.taper) * y_range
+    K, ce = box_stiffness(C_y, data)
+    Vr = reversal_speed(K, C_y, data)
+    Vd = divergence_speed(K, ce, data)
+
+    V = np.arange(0, 300, 1.0) if speeds is None else np.asarray(speeds, dtype=float)
+    return y_range, Vr, Vd, V, effectiveness(V, Vr[-1], Vd[-1])
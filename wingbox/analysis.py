@@ -0,0 +1,8 @@
+''' Full structural analysis of a wing box design: the pipeline of the design scripts'''
+from wingbox.loads import LoadCase
+from wingbox.model import WingBoxModel
+
+
+def analyse(design, points=500, load_case=LoadCase()):
+    """Loads, section properties, deflection, twist and margins of `design` at `points` stations."""
+    return WingBoxModel(design, points, load_case).results()
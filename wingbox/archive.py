@@ -0,0 +1,347 @@
+''' Result archive: sweep results on disk, queryable without loading them into memory
+
+An archive is a directory:
+
+    manifest.json           stations, columns, arrays and the chunks written so far
+    y.npy                   station positions [m]
+    designs.jsonl           the design description of every row (design file format)
+    columns/<name>.f8       one scalar per row, raw float64, read with np.memmap
+    arrays/<name>.z         spanwise arrays, one compressed block per chunk of rows
+    zonemap.npy             smallest and largest value of every column per chunk
+
+The scalars are the results of WingBoxModel.summary() and a few design parameters
+(PARAMETERS), stored column by column so a query only reads the columns it uses. Rows
+are written in chunks of `chunk` designs; every spanwise array of a chunk (chunk rows x
+stations) is compressed losslessly as one block (station differences, byte shuffle,
+zlib), so reading the arrays of a design decompresses one block of the memory mapped
+file. The zone map lets a query skip every chunk that cannot hold a match, and with an
+ordering and a limit stop as soon as no remaining chunk can improve on the rows found:
+
+    with ArchiveWriter("sweep.wba", points=500) as archive:
+        for design in load_designs("variants.jsonl"):
+            archive.append(WingBoxModel(design, 500))
+
+    archive = Archive("sweep.wba")
+    rows = archive.query([(mode, ">=", 1) for mode in MARGIN_COLUMNS] + [("v_percentage", "<", 5)],
+                         order_by="mass", limit=1)
+    archive.design(rows[0]), archive.array("v", rows[0])
+
+The manifest is written last on every flush, so an interrupted writer leaves the archive
+as it was after its last complete chunk.
+'''
+import json
+import operator
+import os
+import zlib
+
+import numpy as np
+
+from wingbox.designfile import design_from_dict, design_to_dict
+from wingbox.margins import Margins
+
+CHUNK = 4096                                    # Rows per chunk
+SUMMARY = ("mass", "v_max", "v_percentage", "phi_max") + tuple("min_" + mode for mode in Margins.MODES)
+MARGIN_COLUMNS = tuple("min_" + mode for mode in Margins.MODES)
+PARAMETERS = ("w_sides_spar", "t_stringer", "h_stringer", "w_sides_stringer", "w_top_side_stringer", "ai_ribs",
+              "rib_thickness", "t_spar_root", "t_top_root", "t_bot_root", "n_top_root", "n_bot_root")
+COLUMNS = SUMMARY + PARAMETERS
+ARRAYS = ("M", "v", "phi") + Margins.MODES      # Spanwise results kept per design
+
+OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq}
+
+
+def design_parameters(design):
+    """The PARAMETERS columns of `design`."""
+    stringer, half_span = design.stringer, design.planform.half_span
+    return {"w_sides_spar": design.w_sides_spar, "t_stringer": stringer.t_stringer,
+            "h_stringer": stringer.h_stringer, "w_sides_stringer": stringer.w_sides_stringer,
+            "w_top_side_stringer": stringer.w_top_side_stringer, "ai_ribs": design.ai_ribs,
+            "rib_thickness": design.rib_thickness,
+            "t_spar_root": float(design.t_sheet_spar(0.0, half_span)),
+            "t_top_root": float(design.t_sheet_hor_top(0.0, half_span)),
+            "t_bot_root": float(design.t_sheet_hor_bottom(0.0, half_span)),
+            "n_top_root": float(design.stringers_top.count(0.0, half_span)),
+            "n_bot_root": float(design.stringers_bot.count(0.0, half_span))}
+
+
+def _compress(block):
+    """Lossless compression of a rows x stations float64 block: the bit patterns as differences between
+    neighbouring stations (small for smooth arrays), byte shuffled (all first bytes, then all second
+    bytes, ...) and zlib compressed."""
+    bits = np.ascontiguousarray(block, dtype="<f8").view("<i8")
+    delta = bits.copy()
+    delta[:, 1:] = np.diff(bits, axis=1)                # Wraps around, and so does the cumsum undoing it
+    return zlib.compress(delta.view(np.uint8).reshape(-1, 8).T.tobytes(), 6)
+
+
+def _decompress(data, shape):
+    shuffled = np.frombuffer(zlib.decompress(data), dtype=np.uint8).reshape(8, -1)
+    delta = np.ascontiguousarray(shuffled.T).view("<i8").reshape(shape)
+    return np.cumsum(delta, axis=1, dtype="<i8").view("<f8")
+
+
+def _write_json(path, content):
+    temporary = path + ".tmp"
+    with open(temporary, "w") as f:
+        json.dump(content, f)
+    os.replace(temporary, path)
+
+
+def _write_zonemap(path, zones):
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        np.save(f, zones)
+    os.replace(temporary, path)
+
+
+# ------------------------------------Writing------------------------------------
+
+class ArchiveWriter:
+    """Appends evaluated designs to a new or existing archive at `path`."""
+
+    def __init__(self, path, points=500, chunk=CHUNK):
+        self.path = path
+        manifest_path = os.path.join(path, "manifest.json")
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+            if self.manifest["points"] != points:
+                raise ValueError("%s holds %d stations, not %d" % (path, self.manifest["points"], points))
+            self._truncate()
+        else:
+            os.makedirs(os.path.join(path, "columns"), exist_ok=True)
+            os.makedirs(os.path.join(path, "arrays"), exist_ok=True)
+            self.manifest = {"version": 1, "points": points, "columns": list(COLUMNS), "arrays": list(ARRAYS),
+                             "rows": 0, "designs_size": 0, "chunks": []}
+            self._truncate()        # Files of a first flush that never wrote its manifest
+        self.chunk = chunk
+        self._y = None
+        self._rows = []             # (description, scalars, arrays) waiting for the next flush
+
+    def _file(self, *parts):
+        return os.path.join(self.path, *parts)
+
+    def _truncate(self):
+        """Drop whatever an interrupted writer left behind the last complete chunk."""
+        manifest = self.manifest
+        for name in manifest["columns"]:
+            with open(self._file("columns", name + ".f8"), "ab") as f:
+                f.truncate(manifest["rows"] * 8)
+        end = {name: 0 for name in manifest["arrays"]}
+        for chunk in manifest["chunks"]:
+            end.update({name: offset + size for name, (offset, size) in chunk["blocks"].items()})
+        for name, size in end.items():
+            with open(self._file("arrays", name + ".z"), "ab") as f:
+                f.truncate(size)
+        with open(self._file("designs.jsonl"), "ab") as f:
+            f.truncate(manifest["designs_size"])
+        if not manifest["chunks"]:
+            for name in ("zonemap.npy", "y.npy"):
+                if os.path.exists(self._file(name)):
+                    os.remove(self._file(name))
+        # The zone map is written before the manifest, so it may hold a row for a lost chunk
+        elif os.path.exists(self._file("zonemap.npy")):
+            zones = np.load(self._file("zonemap.npy"))
+            if len(zones) != len(manifest["chunks"]):
+                _write_zonemap(self._file("zonemap.npy"), zones[:len(manifest["chunks"])])
+
+    def append(self, model):
+        """Add an evaluated WingBoxModel (the stages it still needs are computed now)."""
+        results = model.results()
+        if self._y is None:
+            self._y = results["y"]
+        scalars = dict(model.summary(), **design_parameters(model.design))
+        arrays = {name: results[name] for name in ARRAYS}
+        self._rows.append((design_to_dict(model.design), scalars, arrays))
+        if len(self._rows) >= self.chunk:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        manifest = self.manifest
+        descriptions, scalars, arrays = zip(*self._rows)
+        if not os.path.exists(self._file("y.npy")):
+            np.save(self._file("y.npy"), self._y)
+
+        with open(self._file("designs.jsonl"), "a") as f:
+            for description in descriptions:
+                f.write(json.dumps(description) + "\n")
+        table = np.array([[row[name] for name in manifest["columns"]] for row in scalars], dtype="<f8")
+        for i, name in enumerate(manifest["columns"]):
+            with open(self._file("columns", name + ".f8"), "ab") as f:
+                f.write(table[:, i].tobytes())
+        blocks = {}
+        for name in manifest["arrays"]:
+            with open(self._file("arrays", name + ".z"), "ab") as f:
+                data = _compress(np.stack([row[name] for row in arrays]))
+                blocks[name] = (f.tell(), len(data))
+                f.write(data)
+
+        zones = np.stack([np.nanmin(table, axis=0), np.nanmax(table, axis=0)], axis=1)[None]
+        if manifest["chunks"]:
+            zones = np.concatenate([np.load(self._file("zonemap.npy"))[:len(manifest["chunks"])], zones])
+        _write_zonemap(self._file("zonemap.npy"), zones)
+
+        manifest["chunks"].append({"start": manifest["rows"], "rows": len(table), "blocks": blocks})
+        manifest["rows"] += len(table)
+        manifest["designs_size"] = os.path.getsize(self._file("designs.jsonl"))
+        _write_json(self._file("manifest.json"), manifest)
+        self._rows = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def archive_designs(designs, path, points=500, load_case=None, chunk=CHUNK):
+    """Evaluate a stream of designs into the archive at `path`; the number of rows added."""
+    from wingbox.loads import LoadCase
+    from wingbox.model import WingBoxModel, shared_loads
+    load_case = load_case or LoadCase()
+    shared_loads(points, load_case)
+    count = 0
+    with ArchiveWriter(path, points, chunk) as writer:
+        for design in designs:
+            writer.append(WingBoxModel(design, points, load_case))
+            count += 1
+    return count
+
+
+# ------------------------------------Reading------------------------------------
+
+class Archive:
+    """Read access to an archive; nothing is loaded before it is asked for."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as f:
+            self.manifest = json.load(f)
+        self.rows = self.manifest["rows"]
+        self.columns = tuple(self.manifest["columns"])
+        self.arrays = tuple(self.manifest["arrays"])
+        self.chunks = self.manifest["chunks"]
+        # Rows beyond the manifest belong to a chunk an interrupted writer did not finish
+        self.zonemap = (np.load(os.path.join(path, "zonemap.npy"))[:len(self.chunks)] if self.chunks
+                        else np.zeros((0, len(self.columns), 2)))
+        self._starts = np.array([c["start"] for c in self.chunks] + [self.rows])
+        self._design_offsets = None
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def y(self):
+        return np.load(os.path.join(self.path, "y.npy"))
+
+    def column(self, name):
+        """All values of a scalar column, memory mapped (read lazily by the OS)."""
+        if name not in self.columns:
+            raise KeyError("no column %r, the archive has %s" % (name, ", ".join(self.columns)))
+        if self.rows == 0:
+            return np.zeros(0)
+        return np.memmap(os.path.join(self.path, "columns", name + ".f8"), dtype="<f8", mode="r",
+                         shape=(self.rows,))
+
+    def scalars(self, row):
+        return {name: float(self.column(name)[row]) for name in self.columns}
+
+    def array(self, name, row):
+        """Spanwise array `name` of one row (decompresses the block of its chunk)."""
+        return self.chunk_arrays(name, self._chunk_of(row))[row - self._starts[self._chunk_of(row)]]
+
+    def chunk_arrays(self, name, chunk):
+        """Spanwise array `name` of all rows of a chunk (rows x stations)."""
+        if name not in self.arrays:
+            raise KeyError("no array %r, the archive has %s" % (name, ", ".join(self.arrays)))
+        offset, size = self.chunks[chunk]["blocks"][name]
+        data = np.memmap(os.path.join(self.path, "arrays", name + ".z"), dtype=np.uint8, mode="r",
+                         offset=offset, shape=(size,))
+        return _decompress(data, (self.chunks[chunk]["rows"], self.manifest["points"]))
+
+    def _chunk_of(self, row):
+        if not 0 <= row < self.rows:
+            raise IndexError("row %d outside the archive of %d rows" % (row, self.rows))
+        return int(np.searchsorted(self._starts, row, side="right") - 1)
+
+    def design(self, row):
+        """The design of a row."""
+        if self._design_offsets is None:
+            with open(os.path.join(self.path, "designs.jsonl"), "rb") as f:
+                lengths = [len(line) for line in f]
+            self._design_offsets = np.concatenate([[0], np.cumsum(lengths)])[:self.rows + 1]
+        self._chunk_of(row)
+        with open(os.path.join(self.path, "designs.jsonl"), "rb") as f:
+            f.seek(self._design_offsets[row])
+            return design_from_dict(json.loads(f.readline()))
+
+    # -------------------------Queries-------------------------
+
+    def _possible(self, conditions):
+        """Chunks whose zone map does not rule out any condition."""
+        keep = np.ones(len(self.chunks), dtype=bool)
+        for name, op, value in conditions:
+            low, high = self.zonemap[:, self.columns.index(name)].T
+            if op in ("<", "<="):
+                keep &= OPERATORS[op](low, value)
+            elif op in (">", ">="):
+                keep &= OPERATORS[op](high, value)
+            else:
+                keep &= (low <= value) & (value <= high)
+        return np.flatnonzero(keep)
+
+    def query(self, conditions=(), order_by=None, descending=False, limit=None):
+        """Rows meeting all conditions (column, operator, value), e.g. ("min_crack", ">=", 1).
+
+        Optionally ordered by a column and cut off after `limit` rows. Only the chunks the
+        zone map allows are read, and only the columns the query uses.
+        """
+        for name, op, value in conditions:
+            if name not in self.columns:
+                raise KeyError("no column %r, the archive has %s" % (name, ", ".join(self.columns)))
+            if op not in OPERATORS:
+                raise ValueError("unknown operator %r, use one of %s" % (op, " ".join(OPERATORS)))
+        chunks = self._possible(conditions)
+        columns = {name: self.column(name) for name in {c[0] for c in conditions} | ({order_by} - {None})}
+        sign = -1 if descending else 1
+        if order_by is not None:
+            # Most promising chunk first, so the search can stop early
+            bound = self.zonemap[chunks, self.columns.index(order_by), 1 if descending else 0] * sign
+            chunks = chunks[np.argsort(bound, kind="stable")]
+
+        found, keys, total = [], [], 0
+        for chunk in chunks:
+            if order_by is not None and limit is not None and total >= limit:
+                worst = np.sort(np.concatenate(keys))[limit - 1]
+                if self.zonemap[chunk, self.columns.index(order_by), 1 if descending else 0] * sign > worst:
+                    break
+            start, stop = self._starts[chunk], self._starts[chunk + 1]
+            match = np.ones(stop - start, dtype=bool)
+            for name, op, value in conditions:
+                match &= OPERATORS[op](columns[name][start:stop], value)
+            rows = start + np.flatnonzero(match)
+            found.append(rows)
+            total += len(rows)
+            if order_by is not None:
+                keys.append(sign * np.asarray(columns[order_by][rows]))
+            if order_by is None and limit is not None and total >= limit:
+                break
+        if not found:
+            return np.zeros(0, dtype=int)
+        rows = np.concatenate(found)
+        if order_by is not None:
+            rows = rows[np.argsort(np.concatenate(keys), kind="stable")]
+        return rows[:limit]
+
+
+def lightest_feasible(archive, max_deflection=5.0):
+    """Row of the lightest design with all minimum margins >= 1 and a tip deflection below
+    `max_deflection` percent of the span, or None."""
+    rows = archive.query([(name, ">=", 1) for name in MARGIN_COLUMNS] + [("v_percentage", "<", max_deflection)],
+                         order_by="mass", limit=1)
+    return int(rows[0]) if len(rows) else None
@@ -0,0 +1,225 @@
+''' Design choices of a wing box: material, thickness schedules, stringers and ribs'''
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from wingbox.geometry import Planform
+from wingbox.profiling import hot
+
+
+# ---------------------------------Material---------------------------------
+
+@dataclass(frozen=True)
+class Material:
+    name: str
+    E: float                    # E-modulus of material     [Pa]
+    G: float                    # G-modulus of material     [Pa]
+    rho: float                  # Density of material       [kg/m^3]
+    poisson_ratio: float        # Poisson ratio of material [-]
+    sigma_yield: float          # Yield strength            [Pa]
+    k1c: float                  # Fracture toughness        [Pa*m^-1/2]
+
+
+ksi = 6.895 * 10 ** 6           # ksi to Pa
+
+AL2024 = Material("Al-2024", E=73.1 * 10 ** 9, G=28 * 10 ** 9, rho=2780, poisson_ratio=0.33,
+                  sigma_yield=410 * 10 ** 6, k1c=41 * 10 ** 6)
+AL4047 = Material("Al-4047", E=72 * 10 ** 9, G=27 * 10 ** 9, rho=2660, poisson_ratio=0.33,
+                  sigma_yield=60 * ksi, k1c=40 * 10 ** 6)
+
+
+# -----------------Stringer properties as a function of the geometry (hat stringer)-----------------
+#        w_top_side_stringer
+#      <----->
+#      ______         ^
+#     |      |        | h_stringer
+#  ___|      |___     v
+#  <-->
+#  w_sides_stringer
+
+@dataclass(frozen=True)
+class HatStringer:
+    t_stringer: float           # Thickness stringer [m]
+    h_stringer: float           # Height of stringer vertical side [m]
+    w_sides_stringer: float     # Width of the sides of the stringer [m]
+    w_top_side_stringer: float  # Width of the top side of the stringer [m]
+    corner_overlaps: int = 4    # Corners counted twice by the perimeter area formula [-]
+
+    @property
+    def area(self):
+        """Area stringer [m^2]"""
+        t = self.t_stringer
+        return t * (2 * self.h_stringer + 2 * self.w_sides_stringer + self.w_top_side_stringer) \
+            - self.corner_overlaps * t * t
+
+    @property
+    def z_na(self):
+        """Centroid of the stringer, measured from the sheet it is attached to [m]"""
+        t, h, ws, wt = self.t_stringer, self.h_stringer, self.w_sides_stringer, self.w_top_side_stringer
+        return (2 * (ws * t * t / 2) + 2 * (h * t * (h / 2 + t)) + wt * t * (t + t / 2 + h)) / \
+               (2 * ws * t + 2 * h * t + wt * t)
+
+    @property
+    def ixx(self):
+        """Ixx around the stringer's NA [m^4]"""
+        t, h, ws, wt = self.t_stringer, self.h_stringer, self.w_sides_stringer, self.w_top_side_stringer
+        z = self.z_na
+        return 2 * (1 / 12 * t ** 3 * ws + t * ws * (z - t / 2) ** 2) \
+            + 2 * (1 / 12 * h ** 3 * t + h * t * (z - (h / 2 + t)) ** 2) \
+            + 1 / 12 * t ** 3 * wt + t * wt * (t + h + t / 2 - z) ** 2
+
+
+# ---------------Stringers layout--------------------
+''' The layout is given the same way as in the design scripts: `distance` holds the end of
+each interval of stringer variance as a fraction of the half span and every row of
+`stringers` is a stringer location as fraction of the chord, with a 0 in the columns
+(intervals) where that stringer has been terminated. Up to distance[0] all rows count.'''
+
+@dataclass(frozen=True)
+class StringerLayout:
+    distance: tuple             # Interval of stringer variance [%span]
+    stringers: tuple            # Stringer locations per interval [%chord]
+
+    def __post_init__(self):
+        object.__setattr__(self, "distance", tuple(float(d) for d in self.distance))
+        object.__setattr__(self, "stringers", tuple(tuple(float(s) for s in row) for row in self.stringers))
+
+    @property
+    def counts(self):
+        """Number of stringers per interval (the first interval counts every row)."""
+        table = np.array(self.stringers)
+        counts = np.count_nonzero(table, axis=0)
+        counts[0] = len(table)
+        return counts
+
+    @hot
+    def count(self, y, half_span):
+        """Number of stringers at span position(s) y."""
+        y = np.asarray(y, dtype=float)
+        edges = np.array(self.distance) * half_span
+        counts = self.counts
+        interval = np.searchsorted(edges, y, side="right")
+        # A position exactly on the last edge still belongs to the last interval
+        interval = np.where(y == edges[-1], len(edges) - 1, interval)
+        padded = np.append(counts, 0)       # Beyond the last interval there are no stringers
+        return padded[interval]
+
+    def boundaries(self, half_span):
+        return [d * half_span for d in self.distance]
+
+
+# ------------------Thickness schedules------------------
+''' A sheet thickness is piecewise linear along the span. Each segment (end, t_start, t_end)
+follows t = t_start - y * (t_start - t_end) / (b/2) up to y = end * b/2 (inclusive) like the
+thickness functions in the design scripts. An optional constant thickness is used inside the
+fuselage (y <= fuselage_extent [m]). The last segment is open ended.'''
+
+@dataclass(frozen=True)
+class ThicknessSchedule:
+    segments: tuple                         # (end [%span], t_start [m], t_end [m])
+    fuselage_extent: float = 0.0            # Inside fuselage, thick structure [m]
+    fuselage_thickness: float = None        # Thickness inside the fuselage [m]
+
+    def __post_init__(self):
+        object.__setattr__(self, "segments", tuple(tuple(float(v) for v in seg) for seg in self.segments))
+
+    @hot
+    def __call__(self, y, half_span):
+        y = np.asarray(y, dtype=float)
+        ends = np.array([seg[0] for seg in self.segments]) * half_span
+        t_start = np.array([seg[1] for seg in self.segments])
+        t_end = np.array([seg[2] for seg in self.segments])
+
+        segment = np.minimum(np.searchsorted(ends, y, side="left"), len(ends) - 1)
+        t = t_start[segment] - y * (t_start[segment] - t_end[segment]) / half_span
+
+        if self.fuselage_thickness is not None:
+            t = np.where(y <= self.fuselage_extent, self.fuselage_thickness, t)
+        return t
+
+    def boundaries(self, half_span):
+        edges = [seg[0] * half_span for seg in self.segments[:-1]]
+        if self.fuselage_thickness is not None:
+            edges.append(self.fuselage_extent)
+        return edges
+
+
+# ---------------------------------Wing box design---------------------------------
+
+@dataclass(frozen=True)
+class WingBoxDesign:
+    name: str
+    material: Material
+    stringer: HatStringer
+    stringers_top: StringerLayout
+    stringers_bot: StringerLayout
+    t_sheet_spar: ThicknessSchedule
+    t_sheet_hor_top: ThicknessSchedule
+    t_sheet_hor_bottom: ThicknessSchedule
+    w_sides_spar: float                     # Width side flanges spar [m] (without thickness of spar)
+    planform: Planform = field(default_factory=Planform)
+    ai_ribs: float = 0.6                    # Separations between ribs [m]
+    rib_thickness: float = 0.0              # Rib thickness [m] (0: ribs not in the mass)
+    ks: float = 8                           # Shear buckling coefficient [-]
+    kc: float = 6                           # Compressive buckling coefficient [-]
+    cracksize: float = 0.005                # Maximum crack size [m]
+
+    @property
+    def n_rectangles(self):
+        """Number of rib bays along the half span."""
+        return round(self.planform.half_span / self.ai_ribs)
+
+    def boundaries(self):
+        """Span positions where the section properties are discontinuous [m]."""
+        half_span = self.planform.half_span
+        edges = set()
+        for part in (self.stringers_top, self.stringers_bot, self.t_sheet_spar, self.t_sheet_hor_top,
+                     self.t_sheet_hor_bottom):
+            edges.update(part.boundaries(half_span))
+        return sorted(e for e in edges if 0 < e < half_span)
+
+
+# ---------------------------------Designs---------------------------------
+
+FINAL_DESIGN = WingBoxDesign(
+    name="FinalDesignFile",
+    material=AL2024,
+    stringer=HatStringer(t_stringer=0.007, h_stringer=0.05, w_sides_stringer=0.01, w_top_side_stringer=0.07),
+    stringers_top=StringerLayout(
+        distance=(0.6, 1),
+        stringers=((0.1, 0.1), (0.2, 0.2), (0.3, 0.3), (0.4, 0), (0.5, 0.5), (0.6, 0), (0.7, 0), (0.8, 0.8),
+                   (0.9, 0.9), (1, 1))),
+    stringers_bot=StringerLayout(
+        distance=(0.6, 1),
+        stringers=((0.1, 0.1), (0.2, 0), (0.3, 0), (0.4, 0), (0.55, 0), (0.7, 0), (0.85, 0), (1, 1))),
+    t_sheet_spar=ThicknessSchedule(((0.5, 0.006, 0.005), (1, 0.005, 0.003))),
+    t_sheet_hor_top=ThicknessSchedule(((0.5, 0.005, 0.0045), (1, 0.0045, 0.003)),
+                                      fuselage_extent=2, fuselage_thickness=0.01),
+    t_sheet_hor_bottom=ThicknessSchedule(((0.5, 0.005, 0.004), (1, 0.004, 0.002)),
+                                         fuselage_extent=2, fuselage_thickness=0.01),
+    w_sides_spar=0.05,
+)
+
+CHOSEN_TRADE_OFF_DESIGN = WingBoxDesign(
+    name="ChosenTradeOffDesign",
+    material=AL2024,
+    stringer=HatStringer(t_stringer=0.007, h_stringer=0.055, w_sides_stringer=0.01, w_top_side_stringer=0.05,
+                         corner_overlaps=2),
+    stringers_top=StringerLayout(
+        distance=(0.55, 0.95),
+        stringers=((0.1, 0.1), (0.2, 0.2), (0.3, 0.3), (0.4, 0), (0.5, 0.5), (0.6, 0), (0.7, 0), (0.8, 0.8),
+                   (0.9, 0.9), (1, 1))),
+    stringers_bot=StringerLayout(
+        distance=(0.28, 0.42, 0.66, 0.76),
+        stringers=((0.1, 0.1, 0.1, 0.1), (0.15, 0, 0, 0), (0.2, 0.2, 0, 0), (0.25, 0.25, 0.25, 0),
+                   (0.3, 0.3, 0, 0), (0.4, 0.4, 0.4, 0), (0.5, 0.5, 0.5, 0), (0.6, 0.6, 0, 0), (0.7, 0.7, 0.7, 0),
+                   (0.75, 0.75, 0.75, 0), (0.8, 0.8, 0, 0), (0.9, 0.9, 0, 0), (0.95, 0, 0, 0), (1, 1, 1, 1))),
+    t_sheet_spar=ThicknessSchedule(((0.45, 0.006, 0.005), (0.75, 0.005, 0.004), (1, 0.004, 0.002))),
+    t_sheet_hor_top=ThicknessSchedule(((0.35, 0.005, 0.0045), (0.9, 0.0045, 0.003), (1, 0.003, 0.001)),
+                                      fuselage_extent=1.8, fuselage_thickness=0.006),
+    t_sheet_hor_bottom=ThicknessSchedule(((0.55, 0.005, 0.004), (0.8, 0.004, 0.002), (1, 0.002, 0.001)),
+                                         fuselage_extent=2.6, fuselage_thickness=0.009),
+    w_sides_spar=0.035,
+    rib_thickness=0.001,
+    kc=5.75,
+)
@@ -0,0 +1,325 @@
+''' Design files: wing box variants as small JSON descriptions instead of copies of the design scripts
+
+A design file holds only what differs between the variants: material, thickness
+schedules, stringer layouts and the hat stringer geometry (and optionally the planform
+and the rib, buckling and crack parameters). For example:
+
+    {
+      "name": "FinalDesignFile",
+      "material": "Al-2024",
+      "stringer": {"t_stringer": 0.007, "h_stringer": 0.05, "w_sides_stringer": 0.01, "w_top_side_stringer": 0.07},
+      "stringers_top": {"distance": [0.6, 1], "stringers": [[0.1, 0.1], [0.2, 0.2], ...]},
+      "stringers_bot": {"distance": [0.6, 1], "stringers": [[0.1, 0.1], [0.2, 0], ...]},
+      "t_sheet_spar": {"segments": [[0.5, 0.006, 0.005], [1, 0.005, 0.003]]},
+      "t_sheet_hor_top": {"segments": [[0.5, 0.005, 0.0045], [1, 0.0045, 0.003]],
+                          "fuselage_extent": 2, "fuselage_thickness": 0.01},
+      "t_sheet_hor_bottom": {...},
+      "w_sides_spar": 0.05
+    }
+
+The material is the name of a known material or a full material description. A variant
+can also start from another design with "base" (a preset name or a design file relative
+to the variant) and only give the fields it changes. Sweeps are JSON Lines files, one
+variant per line, which load_designs streams without reading the whole file.
+'''
+import json
+import math
+import os
+from dataclasses import asdict, fields, replace
+
+from wingbox.design import (AL2024, AL4047, CHOSEN_TRADE_OFF_DESIGN, FINAL_DESIGN, HatStringer, Material,
+                            StringerLayout, ThicknessSchedule, WingBoxDesign)
+from wingbox.geometry import Planform
+
+MATERIALS = {m.name: m for m in (AL2024, AL4047)}
+PRESETS = {d.name: d for d in (FINAL_DESIGN, CHOSEN_TRADE_OFF_DESIGN)}
+
+SCHEDULES = ("t_sheet_spar", "t_sheet_hor_top", "t_sheet_hor_bottom")
+LAYOUTS = ("stringers_top", "stringers_bot")
+
+
+class DesignError(ValueError):
+    """A design description that is incomplete or not physically meaningful."""
+
+
+# ------------------------------------Checks------------------------------------
+
+def _number(value, where, positive=False, allow_zero=False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise DesignError("%s: expected a number, got %r" % (where, value))
+    if positive and not (value > 0 or (allow_zero and value == 0)):
+        raise DesignError("%s: must be %s, got %r" % (where, "non-negative" if allow_zero else "positive", value))
+    return float(value)
+
+
+def _fraction(value, where):
+    value = _number(value, where)
+    if not 0 <= value <= 1:
+        raise DesignError("%s: must be a fraction between 0 and 1, got %r" % (where, value))
+    return value
+
+
+def _mapping(value, where, cls, required=None):
+    """Check the keys of `value` against the fields of the dataclass `cls`."""
+    if not isinstance(value, dict):
+        raise DesignError("%s: expected an object, got %r" % (where, value))
+    names = [f.name for f in fields(cls)]
+    unknown = sorted(set(value) - set(names))
+    if unknown:
+        raise DesignError("%s: unknown field(s) %s" % (where, ", ".join(unknown)))
+    missing = [name for name in (required if required is not None else names) if name not in value]
+    if missing:
+        raise DesignError("%s: missing field(s) %s" % (where, ", ".join(missing)))
+    return value
+
+
+def _list(value, where):
+    if not isinstance(value, (list, tuple)) or not value:
+        raise DesignError("%s: expected a non-empty list, got %r" % (where, value))
+    return value
+
+
+def _increasing(values, where):
+    if any(b <= a for a, b in zip(values, values[1:])):
+        raise DesignError("%s: must be increasing, got %r" % (where, list(values)))
+
+
+# ------------------------------------Parts------------------------------------
+
+def _material(value, where="material"):
+    if isinstance(value, str):
+        if value not in MATERIALS:
+            raise DesignError("%s: unknown material %r (known: %s)" % (where, value, ", ".join(MATERIALS)))
+        return MATERIALS[value]
+    _mapping(value, where, Material)
+    props = {k: _number(v, "%s.%s" % (where, k), positive=True) for k, v in value.items() if k != "name"}
+    if not props["poisson_ratio"] < 0.5:
+        raise DesignError("%s.poisson_ratio: must be below 0.5, got %r" % (where, props["poisson_ratio"]))
+    return Material(name=str(value["name"]), **props)
+
+
+def _stringer(value, where="stringer"):
+    _mapping(value, where, HatStringer, required=[f.name for f in fields(HatStringer)][:4])
+    dims = {k: _number(v, "%s.%s" % (where, k), positive=True) for k, v in value.items() if k != "corner_overlaps"}
+    if "corner_overlaps" in value:
+        overlaps = value["corner_overlaps"]
+        if overlaps not in (0, 1, 2, 3, 4):
+            raise DesignError("%s.corner_overlaps: must be an integer from 0 to 4, got %r" % (where, overlaps))
+        dims["corner_overlaps"] = int(overlaps)
+    stringer = HatStringer(**dims)
+    if not stringer.area > 0:
+        raise DesignError("%s: stringer area is not positive" % where)
+    return stringer
+
+
+def _layout(value, where):
+    _mapping(value, where, StringerLayout)
+    distance = [_fraction(d, "%s.distance[%d]" % (where, i))
+                for i, d in enumerate(_list(value["distance"], where + ".distance"))]
+    _increasing(distance, where + ".distance")
+    if distance[0] <= 0:
+        raise DesignError("%s.distance[0]: must be above 0" % where)
+    rows = _list(value["stringers"], where + ".stringers")
+    for j, row in enumerate(rows):
+        row_where = "%s.stringers[%d]" % (where, j)
+        if not isinstance(row, (list, tuple)) or len(row) != len(distance):
+            raise DesignError("%s: expected one location per interval (%d), got %r" % (row_where, len(distance), row))
+        for i, s in enumerate(row):
+            _fraction(s, "%s[%d]" % (row_where, i))
+    layout = StringerLayout(distance, rows)
+    if where == "stringers_top":
+        # The top sheet panels lie between two stringers (margins.top_panel_widths)
+        for i, count in enumerate(layout.counts):
+            if count < 2:
+                raise DesignError("%s: interval %d has %d stringer(s), the top sheet needs at least 2"
+                                  % (where, i, count))
+    return layout
+
+
+def _schedule(value, where):
+    _mapping(value, where, ThicknessSchedule, required=["segments"])
+    segments = _list(value["segments"], where + ".segments")
+    for i, seg in enumerate(segments):
+        seg_where = "%s.segments[%d]" % (where, i)
+        if not isinstance(seg, (list, tuple)) or len(seg) != 3:
+            raise DesignError("%s: expected [end, t_start, t_end], got %r" % (seg_where, seg))
+        _fraction(seg[0], seg_where + "[0]")
+        _number(seg[1], seg_where + "[1]", positive=True)
+        _number(seg[2], seg_where + "[2]", positive=True)
+    _increasing([seg[0] for seg in segments], where + ".segments (ends)")
+    schedule = ThicknessSchedule(segments, _number(value.get("fuselage_extent", 0.0), where + ".fuselage_extent",
+                                                   positive=True, allow_zero=True),
+                                 value.get("fuselage_thickness"))
+    if schedule.fuselage_thickness is not None:
+        _number(schedule.fuselage_thickness, where + ".fuselage_thickness", positive=True)
+    # The linear segments must not run through zero before their end
+    for i, (end, t_start, t_end) in enumerate(schedule.segments):
+        if not t_start - end * (t_start - t_end) > 0:
+            raise DesignError("%s.segments[%d]: thickness is not positive at the end of the segment" % (where, i))
+    return schedule
+
+
+def _planform(value, base, where="planform"):
+    _mapping(value, where, Planform, required=[])
+    planform = replace(base, **{k: _number(v, "%s.%s" % (where, k), positive=True) for k, v in value.items()})
+    if not planform.x_frontspar < planform.x_rearspar:
+        raise DesignError("%s: front spar must be ahead of the rear spar" % where)
+    return planform
+
+
+# ------------------------------------Designs------------------------------------
+
+_BUILDERS = dict(
+    material=_material,
+    stringer=_stringer,
+    **{name: _layout for name in LAYOUTS},
+    **{name: _schedule for name in SCHEDULES},
+)
+_SCALARS = {"w_sides_spar": False, "ai_ribs": False, "rib_thickness": True, "ks": False, "kc": False,
+            "cracksize": False}     # name: zero allowed
+
+
+def design_from_dict(description, base=None, directory=None, allow_files=True):
+    """Validated WingBoxDesign from a description (see the module docstring).
+
+    `base` is the design the description starts from (required fields may then be left out);
+    a "base" entry in the description itself overrides it. With `allow_files` False that entry
+    may only be a preset or a description, never a design file. Raises DesignError.
+    """
+    if not isinstance(description, dict):
+        raise DesignError("design: expected an object, got %r" % (description,))
+    description = dict(description)
+    if "base" in description:
+        base = _base(description.pop("base"), directory, allow_files)
+    _mapping(description, "design", WingBoxDesign, required=[] if base is not None else
+             ["name", "material", "stringer", *LAYOUTS, *SCHEDULES, "w_sides_spar"])
+
+    changes = {}
+    for key, value in description.items():
+        if key == "name":
+            changes[key] = str(value)
+        elif key == "planform":
+            changes[key] = _planform(value, base.planform if base is not None else Planform())
+        elif key in _BUILDERS:
+            changes[key] = _BUILDERS[key](value, key)
+        else:
+            changes[key] = _number(value, key, positive=True, allow_zero=_SCALARS[key])
+    design = replace(base, **changes) if base is not None else WingBoxDesign(**changes)
+
+    if not design.ai_ribs < design.planform.half_span:
+        raise DesignError("ai_ribs: rib pitch must be smaller than the half span")
+    # The top panels are as wide as at the root side of their rib bay, and beyond the last
+    # interval of a layout there are no stringers (margins.top_panel_widths)
+    half_span = design.planform.half_span
+    roots = [bay * design.ai_ribs for bay in range(design.n_rectangles)]
+    for y, count in zip(roots, design.stringers_top.count(roots, half_span)):
+        if count < 2:
+            raise DesignError("stringers_top: %d stringer(s) at the rib bay from %.2f m (%.0f%% span), the top "
+                              "sheet needs at least 2" % (count, y, 100 * y / half_span))
+    return design
+
+
+def design_to_dict(design):
+    """Description of `design` that design_from_dict turns back into the same design."""
+    out = asdict(design)
+    out["material"] = design.material.name if MATERIALS.get(design.material.name) == design.material \
+        else out["material"]
+    if design.planform == Planform():
+        del out["planform"]
+    for name in LAYOUTS:
+        out[name] = {"distance": list(out[name]["distance"]), "stringers": [list(r) for r in out[name]["stringers"]]}
+    for name in SCHEDULES:
+        schedule = out[name]
+        schedule["segments"] = [list(seg) for seg in schedule["segments"]]
+        if schedule["fuselage_thickness"] is None:
+            del schedule["fuselage_thickness"], schedule["fuselage_extent"]
+    return out
+
+
+def _base(base, directory, allow_files=True):
+    if isinstance(base, dict):
+        return design_from_dict(base, directory=directory, allow_files=allow_files)
+    if not isinstance(base, str):
+        raise DesignError("base: expected a preset name, a design file or an object, got %r" % (base,))
+    if base in PRESETS:
+        return PRESETS[base]
+    if not allow_files:
+        raise DesignError("base: %r is not a preset (%s), and design files are not allowed here"
+                          % (base, ", ".join(PRESETS)))
+    path = os.path.join(directory or os.curdir, base)
+    if not os.path.exists(path):
+        raise DesignError("base: %r is neither a preset (%s) nor a design file" % (base, ", ".join(PRESETS)))
+    return load_design(path)
+
+
+# ------------------------------------Files------------------------------------
+
+def load_design(path):
+    """Read and validate one design file."""
+    with open(path) as f:
+        try:
+            description = json.load(f)
+        except json.JSONDecodeError as e:
+            raise DesignError("%s: %s" % (path, e)) from None
+    try:
+        return design_from_dict(description, directory=os.path.dirname(path))
+    except DesignError as e:
+        raise DesignError("%s: %s" % (path, e)) from None
+
+
+def dump_design(design, path):
+    """Write `design` as a design file: one field per line, stringer tables one row per line."""
+    lines = []
+    for key, value in design_to_dict(design).items():
+        if key in LAYOUTS:
+            rows = ",\n      ".join(json.dumps(row) for row in value["stringers"])
+            value = '{"distance": %s,\n    "stringers": [\n      %s]}' % (json.dumps(value["distance"]), rows)
+        else:
+            value = json.dumps(value)
+        lines.append('  "%s": %s' % (key, value))
+    with open(path, "w") as f:
+        f.write("{\n%s\n}\n" % ",\n".join(lines))
+
+
+def _named(design, description, where):
+    return design if "name" in description else replace(design, name=where)
+
+
+def load_designs(path, base=None):
+    """Designs of a sweep, one at a time.
+
+    `path` is a JSON Lines file (one description per line, blank lines and lines starting
+    with # are skipped), a JSON file holding a list of descriptions or a single design, or a
+    directory of design files. Variants without "base" start from `base`, if given. Variants
+    without a "name" of their own are named after their place in the file ("sweep.jsonl:3",
+    "sweep.json[2]"), so every design of a sweep can be told apart by its name.
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".json"):
+                yield load_design(os.path.join(path, name))
+        return
+
+    directory = os.path.dirname(path)
+    if not path.endswith(".jsonl"):
+        with open(path) as f:
+            descriptions = json.load(f)
+        for i, description in enumerate(descriptions if isinstance(descriptions, list) else [descriptions]):
+            try:
+                design = design_from_dict(description, base, directory)
+            except DesignError as e:
+                raise DesignError("%s[%d]: %s" % (path, i, e)) from None
+            yield _named(design, description, "%s[%d]" % (os.path.basename(path), i))
+        return
+
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                description = json.loads(line)
+                design = design_from_dict(description, base, directory)
+            except (DesignError, json.JSONDecodeError) as e:
+                raise DesignError("%s:%d: %s" % (path, line_number, e)) from None
+            yield _named(design, description, "%s:%d" % (os.path.basename(path), line_number))
@@ -0,0 +1,234 @@
+''' Finite element beam model of the wing box: bending and torsion stiffness and mass, statics and modes
+
+The half wing is a row of beam elements along the span with three degrees of freedom
+per node: deflection w (positive up), slope dw/dy and twist phi (positive nose up).
+Bending uses the cubic (Euler-Bernoulli) element, torsion the linear element, both with
+consistent mass matrices. Element properties are the section properties of the design
+at the element centres (EI = E Ixx, GJ = G J, mass rho A and the polar inertia of the
+section, Ixx + Izz); the engine is a lumped mass ahead of the box.
+
+Every node only couples to its neighbours, so with the degrees of freedom numbered node
+by node the matrices have a half bandwidth of 5. The static solve works on the banded
+(upper) storage and takes any number of load vectors at once; the modes come from a
+sparse shift-invert eigensolver. Both scale linearly with the number of elements.
+
+    beam = BeamModel.from_design(FINAL_DESIGN, elements=200)
+    w, slope, phi = beam.static(q=lift_per_span, t=torque_per_span)
+    frequencies, shapes, kinds = beam.modes(6)
+'''
+from functools import cached_property
+from math import pi
+
+import numpy as np
+
+from wingbox import loads, section
+from wingbox.profiling import hot
+
+DOFS = 3                        # w, dw/dy, phi per node
+BANDWIDTH = 2 * DOFS - 1        # Upper half bandwidth of the stiffness and mass matrices
+W, SLOPE, PHI = range(DOFS)
+
+CLAMPED = {W: None, SLOPE: None, PHI: None}     # Root support: all degrees of freedom fixed
+
+
+def polar_inertia(sec):
+    """Polar second moment of area of the box about the shear centre (box centre, z = z_na) [m^4]:
+    Ixx of the section plus Izz of the walls about the box centre line."""
+    w, h = sec.w_sheet, sec.h_spar
+    izz = (sec.t_top + sec.t_bot) * w ** 3 / 12 + 2 * sec.t_spar * h * (w / 2) ** 2
+    return sec.ixx + izz
+
+
+# ------------------------------------Element matrices------------------------------------
+
+def element_stiffness(L, EI, GJ):
+    """Stiffness matrices of the elements (elements x 6 x 6), dofs (w1, slope1, phi1, w2, slope2, phi2)."""
+    k = np.zeros((len(L), 6, 6))
+    b = EI / L ** 3
+    bending = np.array([[12, 6, -12, 6], [6, 4, -6, 2], [-12, -6, 12, -6], [6, 2, -6, 4]])
+    scale = np.array([1, 0, 1, 0])          # powers of L per row/column: w 0, slope 1
+    L_pow = L[:, None, None] ** (2 - scale[:, None] - scale[None, :])
+    k[np.ix_(range(len(L)), [0, 1, 3, 4], [0, 1, 3, 4])] = b[:, None, None] * bending * L_pow
+    t = GJ / L
+    k[:, 2, 2] = k[:, 5, 5] = t
+    k[:, 2, 5] = k[:, 5, 2] = -t
+    return k
+
+
+def element_mass(L, m, Ip):
+    """Consistent mass matrices of the elements (elements x 6 x 6)."""
+    M = np.zeros((len(L), 6, 6))
+    bending = np.array([[156, 22, 54, -13], [22, 4, 13, -3], [54, 13, 156, -22], [-13, -3, -22, 4]])
+    scale = np.array([1, 0, 1, 0])
+    L_pow = L[:, None, None] ** (2 - scale[:, None] - scale[None, :])
+    M[np.ix_(range(len(L)), [0, 1, 3, 4], [0, 1, 3, 4])] = (m * L / 420)[:, None, None] * bending * L_pow
+    r = Ip * L / 6
+    M[:, 2, 2] = M[:, 5, 5] = 2 * r
+    M[:, 2, 5] = M[:, 5, 2] = r
+    return M
+
+
+# ------------------------------------Model------------------------------------
+
+class BeamModel:
+    """Bending-torsion beam finite element model of the half wing.
+
+    `supports` maps (node, dof) to None for a fixed degree of freedom or to a spring
+    stiffness [N/m, Nm/rad]; by default the root is clamped. `point_masses` is a list of
+    (node, mass [kg], offset ahead of the elastic axis [m], own polar inertia [kg m^2]).
+    """
+
+    def __init__(self, y, EI, GJ, mass, inertia, supports=None, point_masses=()):
+        self.y = np.asarray(y, dtype=float)                 # Node positions [m]
+        self.L = np.diff(self.y)
+        self.EI, self.GJ = np.asarray(EI, dtype=float), np.asarray(GJ, dtype=float)
+        self.mass = np.asarray(mass, dtype=float)           # Mass per unit span [kg/m]
+        self.inertia = np.asarray(inertia, dtype=float)     # Polar mass moment per unit span [kg m]
+        if supports is None:
+            supports = {(0, dof): None for dof in CLAMPED}
+        self.supports = dict(supports)
+        self.point_masses = tuple(point_masses)
+
+        n_dofs = len(self.y) * DOFS
+        fixed = sorted(node * DOFS + dof for (node, dof), k in self.supports.items() if k is None)
+        self.free = np.setdiff1d(np.arange(n_dofs), fixed)
+        self._index = np.full(n_dofs, -1)
+        self._index[self.free] = np.arange(len(self.free))
+        self.K = self._assemble(element_stiffness(self.L, self.EI, self.GJ), self._springs())
+        self.M = self._assemble(element_mass(self.L, self.mass, self.inertia), self._lumped())
+
+    @classmethod
+    def from_design(cls, design, elements=100, engine=True, supports=None):
+        """Beam model of `design` with `elements` equal elements over the half span."""
+        planform = design.planform
+        y = np.linspace(0, planform.half_span, elements + 1)
+        sec = section.section_properties(design, (y[:-1] + y[1:]) / 2)
+        mat = design.material
+        point_masses = []
+        if engine:
+            y_engine = loads.Y_ENGINE_RATIO * planform.half_span
+            x_e = 0.4661 + 0.15 * loads.chord_loads(y_engine)      # Arm of the engine weight in the torsion
+            point_masses.append((int(np.argmin(np.abs(y - y_engine))), loads.W_ENGINE / 9.81, x_e, 0.0))
+        return cls(y, mat.E * sec.ixx, mat.G * sec.J, mat.rho * sec.area, mat.rho * polar_inertia(sec),
+                   supports, point_masses)
+
+    @property
+    def nodes(self):
+        return len(self.y)
+
+    # -------------------------Assembly-------------------------
+
+    def _springs(self):
+        rows = [node * DOFS + dof for (node, dof), k in self.supports.items() if k is not None]
+        values = [k for k in self.supports.values() if k is not None]
+        return rows, rows, values
+
+    def _lumped(self):
+        rows, cols, values = [], [], []
+        for node, m, d, J in self.point_masses:
+            w, phi = node * DOFS + W, node * DOFS + PHI     # The mass point moves with w + d phi
+            rows += [w, w, phi, phi]
+            cols += [w, phi, w, phi]
+            values += [m, m * d, m * d, m * d ** 2 + J]
+        return rows, cols, values
+
+    def _assemble(self, elements, extra):
+        """Coordinates (rows, cols, values) over the free degrees of freedom of the element matrices
+        and the extra entries, summed."""
+        first = np.arange(len(self.L))[:, None] * DOFS + np.arange(2 * DOFS)[None, :]
+        rows = np.broadcast_to(first[:, :, None], elements.shape).ravel()
+        cols = np.broadcast_to(first[:, None, :], elements.shape).ravel()
+        rows = np.concatenate([rows, np.asarray(extra[0], dtype=int)])
+        cols = np.concatenate([cols, np.asarray(extra[1], dtype=int)])
+        values = np.concatenate([elements.ravel(), np.asarray(extra[2], dtype=float)])
+        rows, cols = self._index[rows], self._index[cols]
+        keep = (rows >= 0) & (cols >= 0)
+        return rows[keep], cols[keep], values[keep]
+
+    def banded(self, matrix):
+        """Upper banded storage (BANDWIDTH + 1 x free dofs) of self.K or self.M, as used by solveh_banded."""
+        rows, cols, values = matrix
+        upper = rows <= cols
+        ab = np.zeros((BANDWIDTH + 1, len(self.free)))
+        np.add.at(ab, (BANDWIDTH + rows[upper] - cols[upper], cols[upper]), values[upper])
+        return ab
+
+    def sparse(self, matrix):
+        from scipy.sparse import csc_matrix
+        rows, cols, values = matrix
+        return csc_matrix((values, (rows, cols)), shape=(len(self.free),) * 2)
+
+    # -------------------------Loads and solutions-------------------------
+
+    def load_vector(self, q=None, t=None, forces=None):
+        """Nodal loads (cases x all dofs) of distributed forces q [N/m] and torques t [Nm/m].
+
+        q and t are given at the nodes (cases x nodes, or one row) and taken constant over an
+        element at the mean of its nodes. `forces` is a cases x all dofs array added as is.
+        """
+        cases = [np.atleast_2d(a).shape[0] for a in (q, t, forces) if a is not None] or [1]
+        F = np.zeros((max(cases), self.nodes * DOFS))
+        L = self.L
+        if q is not None:
+            q = np.atleast_2d(q)
+            q_e = (q[:, :-1] + q[:, 1:]) / 2
+            F[:, W:-DOFS:DOFS] += q_e * L / 2
+            F[:, DOFS + W::DOFS] += q_e * L / 2
+            F[:, SLOPE:-DOFS:DOFS] += q_e * L ** 2 / 12
+            F[:, DOFS + SLOPE::DOFS] -= q_e * L ** 2 / 12
+        if t is not None:
+            t = np.atleast_2d(t)
+            t_e = (t[:, :-1] + t[:, 1:]) / 2
+            F[:, PHI:-DOFS:DOFS] += t_e * L / 2
+            F[:, DOFS + PHI::DOFS] += t_e * L / 2
+        if forces is not None:
+            F += forces
+        return F
+
+    def expand(self, x):
+        """Free dof vectors (cases x free dofs) to (cases x nodes x dofs), zero at the fixed dofs."""
+        out = np.zeros(x.shape[:-1] + (self.nodes * DOFS,))
+        out[..., self.free] = x
+        return out.reshape(x.shape[:-1] + (self.nodes, DOFS))
+
+    @cached_property
+    def _stiffness_factor(self):
+        """Banded Cholesky factor of the stiffness matrix, shared by the static solves and the modes."""
+        from scipy.linalg import cholesky_banded
+        return cholesky_banded(self.banded(self.K)), False
+
+    def _solve_free(self, F):
+        from scipy.linalg import cho_solve_banded
+        return cho_solve_banded(self._stiffness_factor, F)
+
+    @hot
+    def solve(self, F):
+        """Displacements (cases x nodes x dofs) for nodal loads F (cases x all dofs), all cases in one solve."""
+        F = np.atleast_2d(F)
+        return self.expand(self._solve_free(F[:, self.free].T).T)
+
+    def static(self, q=None, t=None, forces=None):
+        """Deflection [m], slope [-] and twist [rad] at the nodes (cases x nodes each)."""
+        u = self.solve(self.load_vector(q, t, forces))
+        return u[..., W], u[..., SLOPE], u[..., PHI]
+
+    @hot
+    def modes(self, count=6):
+        """Lowest `count` natural frequencies [Hz], mode shapes (count x nodes x dofs, unit modal mass)
+        and the kind of every mode ("bending" or "torsion", by its share of strain energy)."""
+        from scipy.sparse.linalg import LinearOperator, eigsh
+        K, M = self.sparse(self.K), self.sparse(self.M)
+        # Shift-invert about zero with the banded factor of K, so no general sparse factorisation is needed
+        K_inv = LinearOperator(K.shape, matvec=self._solve_free, dtype=float)
+        omega2, x = eigsh(K, count, M, sigma=0, which="LM", OPinv=K_inv)
+        order = np.argsort(omega2)
+        omega2, x = omega2[order], x[:, order].T
+        x /= np.sqrt(np.einsum("ij,ij->i", x, (M @ x.T).T))[:, None]
+        shapes = self.expand(x)
+
+        phi = self._index[np.arange(self.nodes) * DOFS + PHI]
+        phi = phi[phi >= 0]
+        Kx = (K @ x.T).T
+        torsion_energy = np.sum(x[:, phi] * Kx[:, phi], axis=1) / np.einsum("ij,ij->i", x, Kx)
+        kinds = ["torsion" if e > 0.5 else "bending" for e in torsion_energy]
+        return np.sqrt(np.abs(omega2)) / (2 * pi), shapes, kinds
@@ -0,0 +1,51 @@
+''' Planform and wing box outer geometry as a function of the span position y'''
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Planform:
+    """Wing planform and the outer dimensions of the wing box.
+
+    The spar height and the sheet width vary linearly from root to tip. The
+    defaults are the values used by the design scripts (0.4 chord wide box,
+    spar height of 8.59 % of the local chord).
+    """
+    C_r: float = round(3.695625413, 4)  # Root chord            [m]
+    C_t: float = round(1.107118055, 4)  # Tip chord             [m]
+    b: float = round(24.01371734, 4)    # Wing span             [m]
+    x_frontspar: float = 0.20           # Front spar position   [%]
+    x_rearspar: float = 0.60            # Rear spar position    [%]
+    h_frontspar: float = 0.0908         # Front spar height     [%]
+    h_rearspar: float = 0.0804          # Rear spar height      [%]
+    h_spar_root: float = 0.317473       # Spar height root      [m]
+    h_spar_tip: float = 0.095107        # Spar height tip       [m]
+    w_sheet_root: float = 1.478250      # Sheet width root      [m]
+    w_sheet_tip: float = 0.442847       # Sheet width tip       [m]
+    sweep_quarter_chord: float = 28.8   # Quarter chord sweep   [deg]
+
+    @property
+    def half_span(self):
+        return self.b / 2
+
+    @property
+    def taper(self):
+        return self.C_t / self.C_r
+
+    def stations(self, points):
+        """Calculation stations y_i = i * b / (2 * points), as used by the integrations in the scripts."""
+        return np.arange(points) * self.b / (2 * points)
+
+    def chord(self, y):
+        return self.C_r + self.C_t * (y / self.half_span) - self.C_r * (y / self.half_span)
+
+    def height_spar(self, y):
+        return self.h_spar_root - y * (self.h_spar_root - self.h_spar_tip) / self.half_span
+
+    def width_sheet(self, y):
+        return self.w_sheet_root - y * (self.w_sheet_root - self.w_sheet_tip) / self.half_span
+
+    def enclosed_area(self, y):
+        """Area enclosed by the wing box cell (thin wall) [m^2]."""
+        return self.height_spar(y) * self.width_sheet(y)
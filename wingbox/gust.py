@@ -0,0 +1,149 @@
+''' Discrete one-minus-cosine gust: load factor increments of the rigid aircraft
+
+Vectorised over altitudes, weights, design speeds and gust gradients. Compared to
+V-Nhellrevisited.py the Prandtl-Glauert correction is applied to the incompressible
+lift slope at every speed (instead of compounding it over the loop), the lift slope
+is taken per radian and the reference gust velocity uses the altitude in meters.
+
+Note all speeds are TAS unless otherwise specified
+'''
+from dataclasses import dataclass
+from math import pi, sqrt, tan
+
+import numpy as np
+
+from wingbox.profiling import hot
+
+# ------------------------------------------------Constants--------------------------------------------------------------
+R = 8.314510                # gasconstant [J/(mol*K)]
+M_air = 0.0289645           # Molair mass air [kg/mol]
+g = 9.80665                 # gravitational acceleration [m/s^2]
+rho_0 = 1.225               # density at sealevel [kg/m^3]
+gamma = 1.4                 # adiabatic index of air [-]
+R_air = R / M_air           # shorthand convention [J/kg*K]
+
+# Altitude [m], temperature [K] and density [kg/m^3]: sea level, 2000 ft and cruise altitude (35000 ft)
+ALTITUDES = ((0, 288.15, 1.225), (609.6, 284.1876, 1.1550945), (10668, 218.808, 0.3795655))
+
+
+@dataclass(frozen=True)
+class GustAircraft:
+    M_C: float = 0.77                   # Design cruise mach number[-]
+    S: float = 57.7                     # surface area wing [m^2]
+    MAC: float = 2.63                   # Mean aerodynamic chord [m]
+    MTOW: float = 30502 * g             # [N]
+    MLW: float = 29142.1 * g            # ASSUMED TO BE MTOW - 0.7*FUELWEIGHT!![N]
+    MZFW: float = (30502 - 4533) * g    # [N]
+    OEW: float = 21963 * g              # Operational empty weight [N]
+    CL_clean: float = 1.1               # CL clean config [-]
+    CL_a: float = 0.0762213 * 180 / pi  # CL_a at M=0 [1/rad]
+    Zmo: float = 12000                  # Assumed Ceiling [m]
+    V_C_cruise: float = 228.31          # Cruise speed at cruise altitude (TAS) [m/s]
+
+    @property
+    def weights(self):
+        return np.array([self.MTOW, self.OEW, self.MZFW])
+
+    @property
+    def V_C(self):
+        """Design cruise speed (EAS) [m/s]"""
+        return self.V_C_cruise * sqrt(ALTITUDES[2][2] / rho_0)
+
+    @property
+    def F_g(self):
+        """Flight profile alleviation factor"""
+        R1 = self.MLW / self.MTOW
+        R2 = self.MZFW / self.MTOW
+        F_gz = 1 - (self.Zmo / 76200)
+        F_gm = sqrt(R2 * tan(pi * R1 / 4))
+        return 0.5 * (F_gz + F_gm)
+
+    def gust_gradients(self):
+        """Gust gradients needed to be considered [m] in increments of 1 m"""
+        return np.arange(9, max(107, 12.5 * self.MAC) + 1, 1)
+
+
+def reference_gust_velocity(altitude):
+    """Reference gust velocity Uref (EAS) [m/s]"""
+    altitude = np.asarray(altitude, dtype=float)
+    return np.where(altitude < 4572, 17.07 - altitude * 3.66 / 4572,
+                    np.where(altitude < 18288, 13.41 - (altitude - 4572) * 7.05 / 13716, 6.36))
+
+
+def design_speeds(aircraft, altitude, T, rho, W):
+    """V_B, V_C and V_D (TAS) [m/s] at one altitude, for an array of weights W."""
+    a = sqrt(gamma * R_air * T)  # speed of sound
+
+    V_Ctas = aircraft.V_C * sqrt(rho_0 / rho)
+
+    V_D1 = aircraft.V_C / 0.8
+    V_D2 = (aircraft.M_C / 0.8) * a * sqrt(rho / rho_0)
+    V_D3 = (aircraft.M_C + 0.05) * a * sqrt(rho / rho_0)
+    if max(V_D1, V_D2) * sqrt(rho_0 / rho) >= 0.95 * a:
+        V_D = V_D3
+    else:  # diving velocity if not bound by compress effects [m/s]
+        V_D = max(V_D2, V_D1)
+    V_Dtas = V_D * sqrt(rho_0 / rho)
+
+    # Design speed of maximum gust intensity, with the incompressible lift slope
+    V_S1 = np.sqrt(2 * W / (rho * aircraft.CL_clean * aircraft.S))
+    mu = (2 * W / aircraft.S) / (rho * aircraft.MAC * aircraft.CL_a * g)
+    K_G = (0.88 * mu) / (5.3 + mu)
+    Uref = reference_gust_velocity(altitude)
+    V_B = V_S1 * np.sqrt(1 + (K_G * rho_0 * Uref * aircraft.V_C * aircraft.CL_a) / (2 * W / aircraft.S))
+
+    return V_B, np.full_like(V_B, V_Ctas), np.full_like(V_B, V_Dtas), a
+
+
+def load_factor_increment(t, V, H, W, rho, Uds, CL_a, S):
+    """Load factor increment dn(t) of the rigid aircraft in a one-minus-cosine gust.
+
+    All arguments broadcast against each other.
+    """
+    omega = pi * V / H
+    Kt = 2 * W / (S * CL_a * rho * V * g)
+    return Uds / (2 * g) * (omega * np.sin(omega * t) + (
+        np.exp(-t / Kt) / Kt - np.cos(omega * t) / Kt - omega * np.sin(omega * t)) / (1 + (omega * Kt) ** -2))
+
+
+@hot
+def peak_load_factors(time_steps=100, aircraft=GustAircraft(), block=4096):
+    """Peak |dn| for every altitude, weight, design speed and gust gradient.
+
+    Returns (dn_max, H) with dn_max of shape (altitude, weight, speed [V_B, V_C, V_D], H).
+    The time history of each gust is sampled with `time_steps` points and evaluated in
+    blocks, so fine time grids do not need all histories in memory at once.
+    """
+    W = aircraft.weights
+    H = aircraft.gust_gradients()
+    F_g = aircraft.F_g
+
+    dn_max = np.zeros((len(ALTITUDES), len(W), 3, len(H)))
+    for k, (altitude, T, rho) in enumerate(ALTITUDES):
+        V_B, V_C, V_D, a = design_speeds(aircraft, altitude, T, rho, W)
+        V = np.stack([V_B, V_C, V_D], axis=1)[:, :, None]                 # (weight, speed, 1)
+
+        Uref = reference_gust_velocity(altitude) * np.array([1, 1, 0.5])[:, None]
+        Uds = Uref * F_g * (H / 107) ** (1 / 6)                             # (speed, H)
+        CL_a = aircraft.CL_a / np.sqrt(1 - (V / a) ** 2)                    # Prandtl-Glauert correction
+        W_k = W[:, None, None]
+
+        # Time runs over one gust length 2 pi / omega = 2 H / V, in blocks
+        s = np.linspace(0, 1, time_steps)
+        peak = np.zeros((len(W), 3, len(H)))
+        for start in range(0, time_steps, block):
+            t = (s[start:start + block] * (2 * H / V)[..., None])
+            dn = load_factor_increment(t, V[..., None], H[:, None], W_k[..., None], rho, Uds[..., None],
+                                       CL_a[..., None], aircraft.S)
+            peak = np.maximum(peak, np.max(np.abs(dn), axis=-1))
+        dn_max[k] = peak
+    return dn_max, H
+
+
+def critical_gusts(dn_max, H, aircraft=GustAircraft()):
+    """Critical case per design speed: (dn, altitude, weight, H)."""
+    cases = {}
+    for i, speed in enumerate(("V_B", "V_C", "V_D")):
+        k, w, h = np.unravel_index(np.argmax(dn_max[:, :, i, :]), dn_max[:, :, i, :].shape)
+        cases[speed] = (dn_max[k, w, i, h], ALTITUDES[k][0], aircraft.weights[w], H[h])
+    return cases
@@ -0,0 +1,252 @@
+''' Gust response of the flexible aircraft: one-minus-cosine gusts on the modally reduced wing
+
+The aircraft heaves as a rigid body and the wing deforms in its lowest clamped modes
+(bending and torsion, from the finite element beam model in wingbox.fem), both wings
+moving symmetrically. The lift follows quasi-steady strip theory: the local incidence
+is the gust angle minus the plunge velocity over V plus the elastic twist, with the
+spanwise lift slope of the lifting line scaled to the lift slope of the aircraft (so a
+rigid wing gives the load factors of wingbox.gust). The lift acts on the quarter chord,
+0.15 chord ahead of the box centre, which also loads the torsion modes. Gust
+penetration along the swept span is not modelled.
+
+The reduced equations of every case (altitude x weight x speed x gust gradient) have
+1 + modes degrees of freedom. They are discretised exactly for a piecewise constant
+gust velocity (matrix exponential per case) and all cases advance together in one
+time stepping loop. Bending moment and torque increments at a set of monitor stations
+follow by summation of the aerodynamic and inertia loads outboard of them, which are
+linear in the modal state; those maps are formed once, so the cost per step scales
+with the number of modes and monitor stations, not with the finite element grid.
+
+The loads are increments on top of the 1g flight loads, with the sign convention of
+loads.internal_loads (lift gives a negative moment and a positive torque).
+'''
+from dataclasses import dataclass
+from math import pi
+
+import numpy as np
+
+from wingbox import gust, liftingline
+from wingbox.design import FINAL_DESIGN
+from wingbox.fem import DOFS, PHI, SLOPE, W, BeamModel
+from wingbox.gust import ALTITUDES, GustAircraft
+from wingbox.profiling import hot, stage
+
+AC_OFFSET = 0.15            # Quarter chord ahead of the box centre [%chord]
+
+
+@dataclass(frozen=True)
+class GustResponse:
+    """Peak responses per altitude, weight, speed [V_B, V_C, V_D] and gust gradient."""
+    y: np.ndarray               # Monitor stations [m]
+    H: np.ndarray               # Gust gradients [m]
+    frequencies: np.ndarray     # Natural frequencies of the retained wing modes [Hz]
+    kinds: tuple                # "bending" or "torsion" per mode
+    dn_max: np.ndarray          # Peak load factor increment at the centre of gravity [-]
+    M_max: np.ndarray           # Peak bending moment increment per monitor station [Nm]
+    T_max: np.ndarray           # Peak torque increment per monitor station [Nm]
+
+    def envelope(self):
+        """Largest bending moment and torque increment over all cases, per monitor station."""
+        cases = self.M_max.reshape(-1, len(self.y)), self.T_max.reshape(-1, len(self.y))
+        return cases[0].max(axis=0), cases[1].max(axis=0)
+
+    def critical(self):
+        """Case with the largest root bending moment increment: (altitude [m], weight [N], speed, H [m])."""
+        k, w, v, h = np.unravel_index(np.argmax(self.M_max[..., 0]), self.M_max.shape[:-1])
+        return ALTITUDES[k][0], GustAircraft().weights[w], ("V_B", "V_C", "V_D")[v], self.H[h]
+
+
+# ------------------------------------Modal model------------------------------------
+
+def modal_model(design, modes, elements, stations):
+    """Clamped wing modes reduced to what the gust equations need.
+
+    Returns a dict with the beam model, the frequencies [Hz] and kinds of the modes, per
+    mode the coupling mass with a rigid heave, per node the deflection and twist of every
+    mode, and per monitor station the maps from the loads to the bending moment and torque.
+    """
+    beam = BeamModel.from_design(design, elements)
+    frequencies, shapes, kinds = beam.modes(modes)
+
+    # Heave and modes as free dof vectors; inertia loads per unit acceleration M [r, phi_k]
+    heave = np.zeros(beam.nodes * DOFS)
+    heave[W::DOFS] = 1
+    shapes_free = np.vstack([heave[beam.free], shapes.reshape(modes, -1)[:, beam.free]])
+    inertia = (beam.sparse(beam.M) @ shapes_free.T).T
+    coupling = inertia[1:] @ heave[beam.free]
+    inertia = beam.expand(inertia).reshape(1 + modes, -1).T                 # all dofs x (1 + modes)
+
+    # Summation of forces: nodal loads outboard of a station to its moment and torque
+    monitor = np.unique(np.linspace(0, elements - 1, stations).round().astype(int))
+    outboard = np.arange(beam.nodes)[None, :] > monitor[:, None]          # stations x nodes
+    R_M = np.zeros((len(monitor), beam.nodes, DOFS))
+    R_M[:, :, W] = -(beam.y[None, :] - beam.y[monitor, None]) * outboard
+    R_M[:, :, SLOPE] = -1.0 * outboard
+    R_T = np.zeros((len(monitor), beam.nodes, DOFS))
+    R_T[:, :, PHI] = outboard
+    R_M, R_T = R_M.reshape(len(monitor), -1), R_T.reshape(len(monitor), -1)
+
+    # Lift per span at the nodes to the moment and torque: the consistent nodal loads of an
+    # element are statically equivalent to its resultant at the element centre
+    chord = design.planform.chord(beam.y)
+    centre = (beam.y[:-1] + beam.y[1:]) / 2
+    outboard = outboard[:, 1:]                                              # stations x elements
+    arm = -(centre[None, :] - beam.y[monitor, None]) * beam.L * outboard
+    lift_M, lift_T = np.zeros((2, len(monitor), beam.nodes))
+    for share in (slice(None, -1), slice(1, None)):                         # half of an element to each node
+        lift_M[:, share] += arm / 2
+        lift_T[:, share] += beam.L * outboard / 2
+    lift_T *= AC_OFFSET * chord
+
+    return dict(beam=beam, frequencies=frequencies, kinds=tuple(kinds), coupling=coupling, chord=chord,
+                w=shapes[:, :, W], phi=shapes[:, :, PHI], y=beam.y[monitor],
+                lift_M=lift_M, lift_T=lift_T, inertia_M=-R_M @ inertia, inertia_T=-R_T @ inertia)
+
+
+def _trapezoid_weights(y):
+    weights = np.zeros_like(y)
+    weights[:-1] += np.diff(y) / 2
+    weights[1:] += np.diff(y) / 2
+    return weights
+
+
+def state_matrices(model, mass, q, V, lift_slope, CL_a, S, damping):
+    """State space model of the cases: x' = A x + B u, and the loads M = C_M x + D_M u, T = C_T x + D_T u.
+
+    State (heave, modal coordinates, their velocities), input the gust velocity [m/s].
+    mass [kg], q [Pa], V [m/s], CL_a [1/rad] and the lift slope distribution dL/(q dalpha)
+    at the nodes (cases x nodes) are per case. Returns A, B, (C_M, D_M), (C_T, D_T).
+    """
+    modes = len(model["frequencies"])
+    n = 1 + modes
+    omega = 2 * pi * model["frequencies"]
+    nodes = model["w"].shape[1]
+
+    # Generalized mass, damping and stiffness of both wings
+    Mg = np.zeros((len(mass), n, n))
+    Mg[:, 0, 0] = mass
+    Mg[:, 0, 1:] = Mg[:, 1:, 0] = 2 * model["coupling"]
+    Mg[:, range(1, n), range(1, n)] = 2
+    Cg = np.diag(np.append(0, 2 * 2 * damping * omega))
+    Kg = np.diag(np.append(0, 2 * omega ** 2))
+
+    # Strip theory lift per node, scaled to the lift slope of the aircraft
+    y = model["beam"].y
+    weights = _trapezoid_weights(y)
+    lift_slope = lift_slope * (CL_a * S / (2 * lift_slope @ weights))[:, None]
+    lift = q[:, None] * lift_slope                                      # Lift per span and radian [N/m]
+    strip = 2 * lift * weights                                          # both wings [N per rad]
+
+    plunge = np.vstack([np.ones(nodes), model["w"]]).T                  # nodes x n
+    twist = np.vstack([np.zeros(nodes), model["phi"]]).T
+    work = plunge + AC_OFFSET * model["chord"][:, None] * twist         # Virtual displacement of the lift
+    b = strip @ work
+    D = np.einsum("ni,cn,nj->cij", work, strip, plunge)
+    E = np.einsum("ni,cn,nj->cij", work, strip, twist)
+
+    Mg_inv = np.linalg.inv(Mg)
+    A = np.zeros((len(mass), 2 * n, 2 * n))
+    A[:, :n, n:] = np.eye(n)
+    A[:, n:, :n] = -Mg_inv @ (Kg - E)
+    A[:, n:, n:] = -Mg_inv @ (Cg + D / V[:, None, None])
+    B = np.zeros((len(mass), 2 * n))
+    B[:, n:] = np.einsum("cij,cj->ci", Mg_inv, b) / V[:, None]
+
+    # Loads: lift per span (1/V) u + twist.xi - plunge.xi' / V at the nodes, and inertia from xi''
+    outputs = []
+    for aero, inertia in ((model["lift_M"], model["inertia_M"]), (model["lift_T"], model["inertia_T"])):
+        S_c = aero[None] * lift[:, None, :]                             # cases x stations x nodes
+        C = np.concatenate([S_c @ twist, -S_c @ plunge / V[:, None, None]], axis=2)
+        C += inertia[None] @ A[:, n:, :]
+        D = S_c.sum(axis=2) / V[:, None] + B[:, n:] @ inertia.T
+        outputs.append((C, D))
+    return A, B, outputs[0], outputs[1]
+
+
+def discretise(A, B, dt):
+    """Exact discrete step for an input held constant over dt: x+ = Phi x + Gamma u."""
+    from scipy.linalg import expm
+    n = A.shape[-1]
+    augmented = np.zeros(A.shape[:-2] + (n + 1, n + 1))
+    augmented[..., :n, :n] = A * dt
+    augmented[..., :n, n] = B * dt
+    step = expm(augmented)
+    return step[..., :n, :n], step[..., :n, n]
+
+
+# ------------------------------------Gust response------------------------------------
+
+@hot
+def gust_response(design=FINAL_DESIGN, modes=4, elements=100, stations=21, aircraft=GustAircraft(), damping=0.02,
+                  steps_per_period=20, settle=2.0):
+    """Peak load factor, bending moment and torque increments of every gust case.
+
+    The time step resolves the highest retained mode with `steps_per_period` steps, and
+    every case is followed for the longest gust plus `settle` periods of the lowest mode.
+    Raises ValueError if a case is unstable: quasi-steady aerodynamics can make the high
+    (torsion) modes flutter, which then needs fewer modes rather than a gust response.
+    """
+    with stage("gust modes"):
+        model = modal_model(design, modes, elements, stations)
+    W_ac = aircraft.weights
+    H = aircraft.gust_gradients()
+    F_g = aircraft.F_g
+
+    # Cases: altitude x weight x speed x H, flattened
+    V, rho, mach, Uds, weight = [], [], [], [], []
+    for altitude, T, rho_k in ALTITUDES:
+        V_B, V_C, V_D, a = gust.design_speeds(aircraft, altitude, T, rho_k, W_ac)
+        speeds = np.stack([V_B, V_C, V_D], axis=1)                                  # weight x speed
+        Uref = gust.reference_gust_velocity(altitude) * np.array([1, 1, 0.5])
+        shape = (len(W_ac), 3, len(H))
+        V.append(np.broadcast_to(speeds[..., None], shape))
+        rho.append(np.full(shape, rho_k))
+        mach.append(np.broadcast_to(speeds[..., None] / a, shape))
+        Uds.append(np.broadcast_to((Uref[:, None] * F_g * (H / 107) ** (1 / 6))[None], shape))
+        weight.append(np.broadcast_to(W_ac[:, None, None], shape))
+    V, rho, mach, Uds, weight = (np.concatenate(v).ravel() for v in (V, rho, mach, Uds, weight))
+    Hc = np.tile(H, len(V) // len(H))
+
+    with stage("gust matrices"):
+        planform = design.planform
+        machs, inverse = np.unique(mach.round(4), return_inverse=True)
+        _, slopes = liftingline.lift_slope_distribution(machs, len(model["beam"].y), planform)
+        CL_a = aircraft.CL_a / np.sqrt(1 - mach ** 2)                                   # Prandtl-Glauert correction
+        A, B, (C_M, D_M), (C_T, D_T) = state_matrices(model, weight / gust.g, 0.5 * rho * V ** 2, V,
+                                                      slopes[inverse], CL_a, aircraft.S, damping)
+
+        growth = np.linalg.eigvals(A).real.max(axis=1)
+        if np.any(growth > 0):
+            worst = np.argmax(growth)
+            raise ValueError("%d gust cases are aeroelastically unstable with %d modes (worst at V = %.1f m/s, "
+                             "rho = %.4f kg/m^3); retain fewer modes" % (np.count_nonzero(growth > 0), modes,
+                                                                        V[worst], rho[worst]))
+
+        dt = 1 / (steps_per_period * model["frequencies"].max())
+        duration = 2 * Hc / V                                                           # Gust length in time
+        steps = int(np.ceil((duration.max() + settle / model["frequencies"].min()) / dt))
+        Phi, Gamma = discretise(A, B, dt)
+
+    # Load outputs of both kinds as one matrix on the state extended with the gust velocity
+    loads = np.concatenate([np.concatenate([C_M, D_M[..., None]], axis=2),
+                            np.concatenate([C_T, D_T[..., None]], axis=2)], axis=1)
+    n = 1 + modes
+    state = np.zeros((len(V), 2 * n + 1, 1))
+    dn_max = np.zeros(len(V))
+    peaks = np.zeros((len(V), loads.shape[1], 1))
+    with stage("gust time stepping"):
+        for k in range(steps):
+            t = (k + 0.5) * dt                                              # Gust velocity at the middle of the step
+            u = np.where(t < duration, Uds / 2 * (1 - np.cos(2 * pi * t / duration)), 0.0)
+            x = state[:, :-1, 0]
+            state[:, -1, 0] = u
+            acceleration = np.einsum("cj,cj->c", A[:, n, :], x) + B[:, n] * u
+            np.maximum(dn_max, np.abs(acceleration) / gust.g, out=dn_max)
+            np.maximum(peaks, np.abs(loads @ state), out=peaks)
+            state[:, :-1] = Phi @ state[:, :-1] + (Gamma * u[:, None])[..., None]
+    M_max, T_max = np.split(peaks[..., 0], 2, axis=1)
+
+    shape = (len(ALTITUDES), len(W_ac), 3, len(H))
+    return GustResponse(y=model["y"], H=H, frequencies=model["frequencies"], kinds=model["kinds"],
+                        dn_max=dn_max.reshape(shape), M_max=M_max.reshape(shape + (-1,)),
+                        T_max=T_max.reshape(shape + (-1,)))
@@ -0,0 +1,203 @@
+''' Lifting-line load generator: spanwise lift and pitching moment of the tapered, swept wing
+
+Weissinger's extended lifting line (a vortex lattice with one chordwise panel): a
+horseshoe vortex per spanwise panel, bound on the quarter chord line, with the flow
+tangency condition at the three quarter chord points. The left wing is the mirror image
+of the right. Compressibility is taken into account with the Prandtl-Glauert (Gothert)
+rule: the incompressible problem is solved on the wing stretched by 1/beta in the flow
+direction, which gives the same circulation.
+
+The influence matrix only depends on the planform, the number of panels and the Mach
+number. Its LU factors are cached, and all cases at the same Mach number are solved as
+one right-hand side matrix, so a sweep over angles of attack, speeds and load factors
+costs little more than a single case:
+
+    Ldistr, Mdistr = spanwise_loads(alpha=[0, 2, 4], mach=0.77, V=228.31, rho=0.3796)
+    alpha, Ldistr, Mdistr = trimmed_loads(load_factor=[1, 2.5, 3.75], mach=0.77, V=228.31, rho=0.3796)
+
+The trimmed distributions already carry the load factor, so they go to the wing box
+model as they are: WingBoxModel(design, distributions=(Ldistr[2], Mdistr[2])).
+'''
+from dataclasses import dataclass
+from functools import lru_cache
+from math import pi, radians, sqrt, tan
+
+import numpy as np
+
+from wingbox.geometry import Planform
+from wingbox.profiling import hot
+
+g = 9.80665                                 # gravitational acceleration [m/s^2]
+
+
+@dataclass(frozen=True)
+class AeroData:
+    alpha_0L: float = -4.49                 # Zero lift angle of attack of the airfoil [deg]
+    cm_ac: float = -0.06                    # Airfoil moment coefficient about the aerodynamic centre, M = 0 [-]
+    twist_tip: float = 0.0                  # Geometric twist at the tip, linear from the root [deg]
+    weight: float = 30502 * g               # Weight carried by the wing (MTOW) [N]
+
+
+# ------------------------------------Geometry------------------------------------
+
+def panel_edges(planform, panels):
+    """Spanwise panel edges [m], cosine spaced so the panels get smaller towards the tip."""
+    return planform.half_span * np.sin(np.linspace(0, pi / 2, panels + 1))
+
+
+def quarter_chord_x(planform, y):
+    """Streamwise position of the quarter chord line, leading edge of the root at x = 0 [m]"""
+    return planform.C_r / 4 + np.abs(y) * tan(radians(planform.sweep_quarter_chord))
+
+
+def control_points(planform, panels):
+    """Span position and streamwise position of the three quarter chord point of every panel [m]"""
+    edges = panel_edges(planform, panels)
+    y = (edges[:-1] + edges[1:]) / 2
+    return y, quarter_chord_x(planform, y) + planform.chord(y) / 2
+
+
+# ------------------------------------Influence matrix------------------------------------
+
+def _segment(px, py, ax, ay, bx, by):
+    """Upwash at (px, py) of a unit vortex segment from a to b, all in the z = 0 plane."""
+    r1x, r1y, r2x, r2y = px - ax, py - ay, px - bx, py - by
+    cross = r1x * r2y - r1y * r2x
+    r1, r2 = np.hypot(r1x, r1y), np.hypot(r2x, r2y)
+    dot = (bx - ax) * (r1x / r1 - r2x / r2) + (by - ay) * (r1y / r1 - r2y / r2)
+    return cross * dot / (4 * pi * cross ** 2)
+
+
+def _trailing(px, py, ax, ay):
+    """Upwash at (px, py) of a unit vortex running from a to x = +infinity."""
+    rx, ry = px - ax, py - ay
+    return ry * (1 + rx / np.hypot(rx, ry)) / (4 * pi * ry ** 2)
+
+
+def _horseshoe(px, py, ax, ay, bx, by):
+    """Upwash of a unit horseshoe vortex: from +infinity to a, bound from a to b, and from b to +infinity."""
+    return _segment(px, py, ax, ay, bx, by) + _trailing(px, py, bx, by) - _trailing(px, py, ax, ay)
+
+
+@hot
+def influence_matrix(planform, panels, mach=0.0):
+    """Upwash at the control points per unit circulation of every panel, with its mirror image [1/m]"""
+    beta = sqrt(1 - mach ** 2)
+    edges = panel_edges(planform, panels)
+    x_edges = quarter_chord_x(planform, edges) / beta
+    y_cp, x_cp = control_points(planform, panels)
+    px, py = (x_cp / beta)[:, None], y_cp[:, None]
+
+    right = _horseshoe(px, py, x_edges[:-1], edges[:-1], x_edges[1:], edges[1:])
+    left = _horseshoe(px, py, x_edges[1:], -edges[1:], x_edges[:-1], -edges[:-1])
+    return right + left
+
+
+@lru_cache(maxsize=64)
+def influence_factors(planform, panels, mach=0.0):
+    """LU factors of the influence matrix, cached per planform, number of panels and Mach number."""
+    from scipy.linalg import lu_factor
+    if not 0 <= mach < 1:
+        raise ValueError("Mach number must be subsonic, got %r" % mach)
+    return lu_factor(influence_matrix(planform, panels, mach))
+
+
+# ------------------------------------Solutions------------------------------------
+
+def local_incidence(planform, panels, alpha, aero=AeroData()):
+    """Angle between the flow and the zero lift line at the control points [rad], cases x panels."""
+    y_cp, _ = control_points(planform, panels)
+    twist = aero.twist_tip * y_cp / planform.half_span
+    return np.radians(np.asarray(alpha, dtype=float)[..., None] + twist - aero.alpha_0L)
+
+
+@hot
+def circulation(incidence, mach, planform=Planform(), panels=100):
+    """Circulation per unit speed Gamma / V [m] for every case (cases x panels).
+
+    Cases with the same Mach number share one factorisation and one solve.
+    """
+    from scipy.linalg import lu_solve
+    incidence = np.atleast_2d(incidence)
+    mach = np.broadcast_to(np.asarray(mach, dtype=float), incidence.shape[:1])
+    gamma = np.empty_like(incidence)
+    for m in np.unique(mach):
+        cases = mach == m
+        gamma[cases] = lu_solve(influence_factors(planform, panels, float(m)), -incidence[cases].T).T
+    return gamma
+
+
+@lru_cache(maxsize=64)
+def _interpolation(planform, panels, points):
+    """Linear interpolation from the panels to `points` stations from root to tip, as a panels x
+    stations matrix. Outside the panel centres the value of the nearest panel is taken, so like the
+    stored distributions the lift at the tip station is that of the outermost panel."""
+    edges = panel_edges(planform, panels)
+    y = np.linspace(0, planform.half_span, points)
+    y_known = (edges[:-1] + edges[1:]) / 2
+    weights = np.stack([np.interp(y, y_known, unit) for unit in np.eye(panels)])
+    weights.flags.writeable = False
+    return y, weights
+
+
+def _to_stations(gamma, planform, panels, points):
+    y, weights = _interpolation(planform, panels, points)
+    return y, gamma @ weights
+
+
+def _moment(planform, y, q, mach, aero):
+    """Pitching moment per unit span about the quarter chord [Nm/m], cases x stations"""
+    beta = np.sqrt(1 - np.asarray(mach, dtype=float) ** 2)
+    return (q * aero.cm_ac / beta)[..., None] * planform.chord(y) ** 2
+
+
+def _cases(*values):
+    return [np.atleast_1d(np.asarray(v, dtype=float)) for v in np.broadcast_arrays(*values)]
+
+
+def lift_slope_distribution(mach, points=500, planform=Planform(), panels=100):
+    """Lift per unit span, dynamic pressure and radian of uniform incidence, dL/(q dalpha) [m],
+    at `points` stations from root to tip, one row per Mach number."""
+    mach = np.atleast_1d(np.asarray(mach, dtype=float))
+    gamma = circulation(np.ones((len(mach), panels)), mach, planform, panels)
+    y, gamma = _to_stations(gamma, planform, panels, points)
+    return y, 2 * gamma                                             # L = rho V^2 Gamma / V = 2 q Gamma / V
+
+
+def spanwise_loads(alpha, mach, V, rho, points=500, planform=Planform(), panels=100, aero=AeroData()):
+    """Lift [N/m] and pitching moment [Nm/m] at `points` stations from root to tip, one row per case.
+
+    alpha [deg], mach [-], V [m/s] (TAS) and rho [kg/m^3] broadcast against each other.
+    """
+    alpha, mach, V, rho = _cases(alpha, mach, V, rho)
+    gamma = circulation(local_incidence(planform, panels, alpha, aero), mach, planform, panels)
+    y, gamma = _to_stations(gamma, planform, panels, points)
+    q = 0.5 * rho * V ** 2
+    return rho[:, None] * V[:, None] ** 2 * gamma, _moment(planform, y, q, mach, aero)
+
+
+def trimmed_loads(load_factor, mach, V, rho, points=500, planform=Planform(), panels=100, aero=AeroData()):
+    """Angle of attack [deg], lift [N/m] and pitching moment [Nm/m] of the wing carrying load_factor * weight.
+
+    The lift is linear in the angle of attack, so every Mach number only needs the solutions
+    at zero angle of attack and per unit angle (one solve with two right-hand sides).
+    """
+    load_factor, mach, V, rho = _cases(load_factor, mach, V, rho)
+    zero = local_incidence(planform, panels, 0.0, aero)
+    basis = np.stack([zero, np.full_like(zero, radians(1))])     # 0 deg and the increment of 1 deg
+
+    edges = panel_edges(planform, panels)
+    span = np.diff(edges)
+    alpha = np.empty_like(load_factor)
+    gamma = np.empty((len(load_factor), panels))
+    for m in np.unique(mach):
+        cases = mach == m
+        gamma_0, gamma_a = circulation(basis, np.full(2, m), planform, panels)
+        dynamic = rho[cases] * V[cases] ** 2                            # lift = rho V^2 Gamma / V
+        lift_0, lift_a = 2 * dynamic * (gamma_0 @ span), 2 * dynamic * (gamma_a @ span)
+        alpha[cases] = (load_factor[cases] * aero.weight - lift_0) / lift_a
+        gamma[cases] = gamma_0 + alpha[cases, None] * gamma_a
+
+    y, gamma = _to_stations(gamma, planform, panels, points)
+    q = 0.5 * rho * V ** 2
+    return alpha, rho[:, None] * V[:, None] ** 2 * gamma, _moment(planform, y, q, mach, aero)
@@ -0,0 +1,153 @@
+''' Spanwise loads: lift and moment distribution, internal shear, moment and torsion'''
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from wingbox.profiling import hot
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+@dataclass(frozen=True)
+class LoadCase:
+    load_factor: float = 2.5 * 1.5      # Load factor           [-]
+    V: float = 228.31                   # Max speed             [m/s]
+    T_engine: float = 21244             # Engine thrust         [N]
+
+
+# Aircraft data used by the internal load integration
+L_HALF_SPAN = 12.009                    # Half wing span used for the load integration [m]
+P_ENGINE = 20267                        # Engine point load [N]
+Y_ENGINE_RATIO = 0.35                   # Engine position [%span]
+W_ENGINE = (2066 + (872.57 / 2)) * 9.81 # Engine weight [N]
+Z_ENGINE = 0.7149                       # Thrust line below the box [m]
+THRUST_FACTOR = 0.8765588               # Fraction of the thrust at the design point [-]
+ENGINE_WIDTH = 0.020833                 # Engine torque spread [%span]
+
+
+def wing_weight(y):
+    """Wing weight per unit span [N/m]"""
+    return 391.2366 * (-0.215585 * y + 3.695654)
+
+
+def chord_loads(y):
+    """Chord used for the lift moment arm in the torsion distribution [m]"""
+    return -0.21558573 * y + 3.6956254
+
+
+# -------------------Lift and moment distribution --------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _reference_distributions():
+    table = np.loadtxt(os.path.join(DATA_DIR, "spanwise_loads.csv"), delimiter=",", skiprows=2)
+    table.flags.writeable = False
+    return table[:, 0], table[:, 1]
+
+
+def load_distribution(points=None):
+    """Lift [N/m] and pitching moment [Nm/m] distributions at `points` stations.
+
+    The stored distributions have 500 stations from root to tip; other numbers
+    of stations are linearly interpolated from them. Copies are returned, so
+    callers may modify them.
+    """
+    Ldistr, Mdistr = _reference_distributions()
+    if points is None or points == len(Ldistr):
+        return Ldistr.copy(), Mdistr.copy()
+
+    s_ref = np.linspace(0, 1, len(Ldistr))
+    s = np.linspace(0, 1, points)
+    return np.interp(s, s_ref, Ldistr), np.interp(s, s_ref, Mdistr)
+
+
+def _tail_sum(a):
+    """sum(a[n:]) for every n, along the last axis."""
+    return np.flip(np.cumsum(np.flip(a, axis=-1), axis=-1), axis=-1)
+
+
+# Moment distribution function --------------------------------------------------------------
+
+@hot
+def moment_distribution(Ldistr, loadfactor):
+    """Internal moment and shear distribution.
+
+    Vectorised form of getMomentDistr from the design scripts, including the
+    root station of the lift being set to zero. `loadfactor` may be an array
+    with a trailing axis of length 1 to evaluate several load factors at once.
+
+    Returns (moment [Nm], shear [N]) per station.
+    """
+    Ldistr = np.array(Ldistr, dtype=float)
+    Ldistr[..., 0] = 0
+    Ldistr = -1 * Ldistr * loadfactor
+
+    npoints = Ldistr.shape[-1] - 1
+    dy = L_HALF_SPAN / npoints
+
+    # Engine point load
+    Ppos = round(Y_ENGINE_RATIO * npoints)
+    p = np.zeros(npoints + 1)
+    p[Ppos] = P_ENGINE
+
+    # Wing weight along y
+    W_w_distr = wing_weight((L_HALF_SPAN / npoints) * np.arange(npoints + 1))
+    W_w_distr[0] = 0
+    W_w_distr[npoints] = 0
+
+    sumdistr = W_w_distr + np.round(Ldistr, 3)
+    shear = _tail_sum(sumdistr * dy + p)
+    moment = _tail_sum(shear * dy)
+    return moment, shear
+
+
+# Torsion distribution function -------------------------------------------------------------
+
+@hot
+def torsion_distribution(Ldistr, Mdistr, T_engine, loadfactor):
+    """Internal torsion distribution [Nm] per station.
+
+    Vectorised form of getTorsionDistribution. Like the scripts, the lift is
+    taken with its root station set to zero and the engine torque applied in a
+    band of stations around the engine.
+    """
+    Ldistr = np.array(Ldistr, dtype=float)
+    Ldistr[..., 0] = 0
+    Ldistr = Ldistr * loadfactor
+
+    T = T_engine * THRUST_FACTOR
+    x_e = 0.4661 + 0.15 * chord_loads(Y_ENGINE_RATIO * L_HALF_SPAN)
+
+    npoints = Ldistr.shape[-1]
+    y_e_point = round(npoints * Y_ENGINE_RATIO)
+    c_distr = chord_loads((L_HALF_SPAN / npoints) * np.arange(npoints))
+
+    engine_band = np.abs(np.arange(npoints) - y_e_point) < ENGINE_WIDTH * npoints
+    engine = np.where(engine_band, (T * Z_ENGINE - W_ENGINE * x_e) / (ENGINE_WIDTH * 2 * L_HALF_SPAN), 0)
+
+    torsion_distr = np.where(engine_band,
+                             engine + np.round(Ldistr, 3) * 0.15 * c_distr + np.round(Mdistr, 3),
+                             Ldistr * 0.15 * c_distr + np.round(Mdistr, 4))
+
+    dy = L_HALF_SPAN / npoints
+    return _tail_sum(torsion_distr * dy + engine * dy)
+
+
+def internal_loads(points=None, load_case=LoadCase(), distributions=None):
+    """Moment, shear and torsion distributions for a load case at `points` stations.
+
+    `distributions` replaces the stored (Ldistr, Mdistr), for example by the lift and
+    moment of wingbox.liftingline (with a leading axis per case). The stored
+    distributions are those of a 1 g flight and are multiplied by the load factor of the
+    load case; given distributions are taken as they are (trimmed_loads already carries
+    load_factor * weight), so only the engine thrust of the load case applies to them.
+    """
+    if distributions is None:
+        Ldistr, Mdistr = load_distribution(points)
+        load_factor = load_case.load_factor
+    else:
+        (Ldistr, Mdistr), load_factor = distributions, 1.0
+    M, V = moment_distribution(Ldistr, load_factor)
+    T = torsion_distribution(Ldistr, Mdistr, load_case.T_engine, load_factor)
+    return M, V, T
@@ -0,0 +1,84 @@
+''' Critical stresses and margins of safety: buckling, yield and crack propagation'''
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from wingbox import stress
+from wingbox.profiling import hot
+
+
+@dataclass(frozen=True)
+class Margins:
+    """Margins of safety per station (allowable / actual)."""
+    shear_buckling: np.ndarray
+    compressive_buckling: np.ndarray
+    tensile: np.ndarray
+    crack: np.ndarray
+    column_buckling: np.ndarray
+
+    MODES = ("shear_buckling", "compressive_buckling", "tensile", "crack", "column_buckling")
+
+    def minimum(self):
+        return {mode: float(np.min(getattr(self, mode))) for mode in self.MODES}
+
+    def failures(self):
+        return {mode: bool(np.any(getattr(self, mode) < 1)) for mode in self.MODES}
+
+
+# -------------------------------Shear buckling calculations-------------------------------
+
+def tau_crit(design, section):
+    """Critical shear stress of the spar webs [Pa]"""
+    mat = design.material
+    return math.pi ** 2 * design.ks * mat.E * (section.t_spar / section.h_spar) ** 2 / (12 * (1 - mat.poisson_ratio ** 2))
+
+
+# -------------------------------Compressive buckling calculations-------------------------------
+
+def top_panel_widths(design):
+    """b of the top sheet panels, one per rib bay, taken at the root side of the bay [m]"""
+    planform = design.planform
+    y = np.arange(design.n_rectangles) * design.ai_ribs
+    return planform.width_sheet(y) / (design.stringers_top.count(y, planform.half_span) - 1)
+
+
+def sigma_crit(design, section):
+    """Critical compressive stress of the top sheet panels [Pa]"""
+    mat = design.material
+    b_top = top_panel_widths(design)
+    rectangleindex = np.minimum(np.floor(section.y / design.ai_ribs).astype(int), len(b_top) - 1)
+    return math.pi ** 2 * design.kc * mat.E * (section.t_top / b_top[rectangleindex]) ** 2 / (12 * (1 - mat.poisson_ratio ** 2))
+
+
+# -------------------------------Column buckling calculations-------------------------------
+
+def column_crit(design):
+    """Critical column buckling stress of a top stringer between two ribs [Pa]
+
+    This is the check of ChosenTradeOffDesign (clamped stringer of rib pitch length), used for
+    every design. FinalDesignFile instead divides the bending stress at the end of each
+    stringer interval by a critical load (pi^2 E I / 4 L^2, pinned-free over the interval
+    length), an inverted ratio of a stress and a force; that check is not reproduced.
+    """
+    stringer = design.stringer
+    return 4 * math.pi ** 2 * design.material.E * stringer.ixx / (design.ai_ribs ** 2 * stringer.area)
+
+
+# ------------------------ Crack propagation calculations ---------------------------------------------
+
+def sigma_crack(design):
+    """Maximum allowed stress due to cracks [Pa]"""
+    return design.material.k1c / math.sqrt(math.pi * design.cracksize)
+
+
+@hot
+def margins(design, section, M, V, T):
+    """Margins of safety for every failure mode at the stations of `section`."""
+    return Margins(
+        shear_buckling=tau_crit(design, section) / stress.shear_stress(V, T, section),
+        compressive_buckling=sigma_crit(design, section) / stress.compressive_stress(M, section),
+        tensile=design.material.sigma_yield / stress.tensile_stress(M, section),
+        crack=sigma_crack(design) / stress.bottom_stress(M, section),
+        column_buckling=column_crit(design) / stress.stringer_stress(M, section, design.stringer.z_na),
+    )
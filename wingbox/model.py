@@ -0,0 +1,163 @@
+''' Wing box model: the analysis of one design, evaluated stage by stage on demand'''
+import math
+from functools import cached_property, lru_cache
+
+import numpy as np
+
+from wingbox import loads, margins, section, stiffness, stress
+from wingbox.profiling import stage
+
+
+@lru_cache(maxsize=32)
+def shared_loads(points, load_case):
+    """Internal loads per (points, load case), shared by all models. The arrays are read-only."""
+    M, V, T = loads.internal_loads(points, load_case)
+    for a in (M, V, T):
+        a.flags.writeable = False
+    return M, V, T
+
+
+class WingBoxModel:
+    """Analysis of one wing box design at `points` stations.
+
+    Every stage is computed the first time it is used and then kept, so a
+    caller only pays for what it asks for:
+
+        model = WingBoxModel(FINAL_DESIGN)
+        model.mass                  # section areas only
+        model.margins.minimum()     # loads, section properties and stresses
+    """
+
+    def __init__(self, design, points=500, load_case=loads.LoadCase(), distributions=None):
+        self.design = design
+        self.points = points
+        self.load_case = load_case
+        self.distributions = distributions      # (Ldistr, Mdistr) at `points` stations, None: stored loads
+                                                # (taken as the final loads, see loads.internal_loads)
+
+    def __repr__(self):
+        return "WingBoxModel(%s, points=%d)" % (self.design.name, self.points)
+
+    # ------------------Geometry and loads------------------
+
+    @cached_property
+    def y(self):
+        return self.design.planform.stations(self.points)
+
+    @property
+    def dy(self):
+        return self.design.planform.half_span / self.points
+
+    @cached_property
+    def loads(self):
+        """Internal moment, shear and torsion (M, V, T) per station."""
+        with stage("loads"):
+            if self.distributions is not None:
+                return loads.internal_loads(self.points, self.load_case, self.distributions)
+            return shared_loads(self.points, self.load_case)
+
+    # ------------------Section and stiffness------------------
+
+    @cached_property
+    def section(self):
+        with stage("section"):
+            return section.section_properties(self.design, self.y)
+
+    @cached_property
+    def mass(self):
+        """Wing box mass [kg]"""
+        with stage("mass"):
+            return section.wing_box_mass(self.design)
+
+    @property
+    def EI(self):
+        return self.design.material.E * self.section.ixx
+
+    @property
+    def GJ(self):
+        return self.design.material.G * self.section.J
+
+    @cached_property
+    def deflection(self):
+        """Slope and deflection (dvdy, v) per station."""
+        M = self.loads[0]
+        with stage("deflection"):
+            return stiffness.deflection(M, self.design.material.E, self.section.ixx, self.dy)
+
+    @cached_property
+    def twist(self):
+        """Twist [rad] per station."""
+        T = self.loads[2]
+        with stage("twist"):
+            return stiffness.twist(T, self.design.material.G, self.section.J, self.dy)
+
+    @cached_property
+    def beam(self):
+        """Finite element beam model (fem.BeamModel) with one element per station."""
+        from wingbox.fem import BeamModel
+        with stage("beam"):
+            return BeamModel.from_design(self.design, self.points)
+
+    # ------------------Stresses and margins------------------
+
+    @cached_property
+    def stresses(self):
+        """Shear, compressive (top) and tensile (bottom) stress per station [Pa]."""
+        M, V, T = self.loads
+        sec = self.section
+        with stage("stresses"):
+            return {"shear": stress.shear_stress(V, T, sec),
+                    "compressive": stress.compressive_stress(M, sec),
+                    "tensile": stress.tensile_stress(M, sec)}
+
+    @cached_property
+    def margins(self):
+        M, V, T = self.loads
+        sec = self.section
+        with stage("margins"):
+            return margins.margins(self.design, sec, M, V, T)
+
+    # ------------------Results------------------
+
+    @property
+    def v_max(self):
+        """Maximum deflection [m]"""
+        return float(np.max(np.abs(self.deflection[1])))
+
+    @property
+    def phi_max(self):
+        """Maximum twist [deg]"""
+        return float(np.max(np.abs(self.twist)) * 180 / math.pi)
+
+    def summary(self):
+        """Scalar results: mass, maximum deflection and twist and the minimum margins."""
+        out = {"mass": float(self.mass), "v_max": self.v_max,
+               "v_percentage": self.v_max / self.design.planform.b * 100, "phi_max": self.phi_max}
+        out.update({"min_" + mode: value for mode, value in self.margins.minimum().items()})
+        return out
+
+    def results(self):
+        """All spanwise and scalar results as a dictionary of arrays."""
+        M, V, T = self.loads
+        sec = self.section
+        dvdy, v = self.deflection
+        mg = self.margins
+        return {
+            "y": self.y, "M": M, "V": V, "T": T,
+            "ixx": sec.ixx, "z_na": sec.z_na, "J": sec.J,
+            "dvdy": dvdy, "v": v, "phi": self.twist,
+            "shear_buckling": mg.shear_buckling, "compressive_buckling": mg.compressive_buckling,
+            "tensile": mg.tensile, "crack": mg.crack, "column_buckling": mg.column_buckling,
+            "mass": self.mass, "v_max": self.v_max, "phi_max": self.phi_max,
+        }
+
+
+def evaluate_designs(designs, points=500, load_case=loads.LoadCase()):
+    """Stream (design, summary) for every design of a sweep through one shared set of loads.
+
+    `designs` may be any iterable, for example designfile.load_designs(path), so a sweep
+    file is read one variant at a time.
+    """
+    shared_loads(points, load_case)
+    for design in designs:
+        yield design, WingBoxModel(design, points, load_case).summary()
@@ -0,0 +1,146 @@
+''' Monte Carlo uncertainty propagation: failure probabilities from material, thickness and load scatter
+
+Every sample draws the material properties (E, G, sigma_yield, k1c), a thickness
+factor per part (spars, top sheet, bottom sheet, stringers; one factor over the whole
+span, like a manufacturing tolerance on the sheet) and the load factor from normal
+distributions. The samples are evaluated in batches of samples x stations arrays by the
+same functions as the deterministic analysis, the batches are spread over the cores.
+
+Results only depend on the seed and the number of samples, not on the number of workers:
+every batch has a fixed size and its own random stream (SeedSequence.spawn).
+'''
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from wingbox import loads, margins, section
+from wingbox.margins import Margins
+from wingbox.profiling import hot, stage
+
+BATCH_ELEMENTS = 2 ** 20        # samples x stations per batch, bounds the memory per worker
+
+
+@dataclass(frozen=True)
+class Scatter:
+    """Coefficients of variation (standard deviation / mean) of the random inputs [-]."""
+    E: float = 0.02
+    G: float = 0.02
+    sigma_yield: float = 0.04
+    k1c: float = 0.08
+    thickness: float = 0.03     # Of every part thickness (spars, top sheet, bottom sheet, stringers)
+    load_factor: float = 0.05
+
+    # Order of the columns of the standard normal draws
+    VARIABLES = ("E", "G", "sigma_yield", "k1c", "t_spar", "t_top", "t_bot", "t_stringer", "load_factor")
+
+    def factors(self, z):
+        """Multiplicative factors (mean 1) per variable from standard normal draws z (samples x variables)."""
+        cov = np.array([self.E, self.G, self.sigma_yield, self.k1c] + [self.thickness] * 4 + [self.load_factor])
+        return {name: 1 + cov[i] * z[:, i] for i, name in enumerate(self.VARIABLES)}
+
+
+@dataclass(frozen=True)
+class MonteCarloResult:
+    y: np.ndarray                   # Stations [m]
+    samples: int
+    station_failures: dict          # mode -> number of samples with margin < 1, per station
+    minimum_margins: np.ndarray     # Smallest margin over the span, samples x modes (Margins.MODES)
+
+    @property
+    def station_probability(self):
+        """Probability of failure per mode and station."""
+        return {mode: count / self.samples for mode, count in self.station_failures.items()}
+
+    @property
+    def probability(self):
+        """Probability of failure anywhere along the span, per mode."""
+        return {mode: float(np.mean(self.minimum_margins[:, i] < 1)) for i, mode in enumerate(Margins.MODES)}
+
+    @property
+    def system_probability(self):
+        """Probability that any mode fails anywhere."""
+        return float(np.mean(np.any(self.minimum_margins < 1, axis=1)))
+
+    def standard_error(self, p):
+        """Standard error of an estimated probability p."""
+        return np.sqrt(p * (1 - p) / self.samples)
+
+    def summary(self):
+        out = {"samples": self.samples, "system": self.system_probability}
+        out.update(self.probability)
+        return out
+
+
+# ------------------------------------Sampling------------------------------------
+
+def sample_design(design, factors):
+    """`design` with array valued material and stringer properties, one row per sample."""
+    mat = design.material
+    column = {name: f[:, None] for name, f in factors.items()}
+    material = replace(mat, E=mat.E * column["E"], G=mat.G * column["G"],
+                       sigma_yield=mat.sigma_yield * column["sigma_yield"], k1c=mat.k1c * column["k1c"])
+    stringer = replace(design.stringer, t_stringer=design.stringer.t_stringer * column["t_stringer"])
+    return replace(design, material=material, stringer=stringer)
+
+
+def sample_section(design, nominal, factors):
+    """Section properties (samples x stations) with the sampled thicknesses."""
+    stringer = design.stringer
+    t_spar = nominal.t_spar * factors["t_spar"][:, None]
+    t_top = nominal.t_top * factors["t_top"][:, None]
+    t_bot = nominal.t_bot * factors["t_bot"][:, None]
+    ixx, z_na, area, J = section.box_properties(nominal.h_spar, nominal.w_sheet, t_spar, t_top, t_bot, nominal.n_top,
+                                                nominal.n_bot, design.w_sides_spar, stringer.area, stringer.z_na,
+                                                stringer.ixx)
+    return replace(nominal, t_spar=t_spar, t_top=t_top, t_bot=t_bot, ixx=ixx, z_na=z_na, area=area, J=J)
+
+
+@hot
+def evaluate_batch(design, points, load_case, scatter, seed, samples):
+    """Failures per station and minimum margins of one batch of samples."""
+    rng = np.random.default_rng(seed)
+    factors = scatter.factors(rng.standard_normal((samples, len(Scatter.VARIABLES))))
+
+    sampled = sample_design(design, factors)
+    nominal = section.section_properties(design, design.planform.stations(points))
+    sec = sample_section(sampled, nominal, factors)
+
+    Ldistr, Mdistr = loads.load_distribution(points)
+    loadfactor = load_case.load_factor * factors["load_factor"][:, None]
+    M, V = loads.moment_distribution(Ldistr, loadfactor)
+    T = loads.torsion_distribution(Ldistr, Mdistr, load_case.T_engine, loadfactor)
+
+    mg = margins.margins(sampled, sec, M, V, T)
+    station_failures = {}
+    minimum = np.empty((samples, len(Margins.MODES)))
+    for i, mode in enumerate(Margins.MODES):
+        margin = np.broadcast_to(getattr(mg, mode), (samples, points))
+        station_failures[mode] = np.count_nonzero(margin < 1, axis=0)
+        minimum[:, i] = np.min(margin, axis=1)
+    return station_failures, minimum
+
+
+def monte_carlo(design, samples=10000, points=500, load_case=loads.LoadCase(), scatter=Scatter(), seed=0,
+                workers=None):
+    """Failure probabilities of `design` from `samples` random samples.
+
+    `workers` processes evaluate the batches (default: all cores, 1: in this process).
+    """
+    batch = max(1, BATCH_ELEMENTS // points)
+    sizes = [min(batch, samples - start) for start in range(0, samples, batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(design, points, load_case, scatter, s, n) for s, n in zip(seeds, sizes)]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    with stage("montecarlo"):
+        if workers == 1:
+            results = [evaluate_batch(*job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                results = list(pool.map(evaluate_batch, *zip(*jobs)))
+
+    station_failures = {mode: sum(r[0][mode] for r in results) for mode in Margins.MODES}
+    return MonteCarloResult(y=design.planform.stations(points), samples=samples, station_failures=station_failures,
+                            minimum_margins=np.concatenate([r[1] for r in results]))
@@ -0,0 +1,43 @@
+''' Plots of the design scripts: margins of safety, deflection, slope and moment along the span
+
+matplotlib is imported when a plot is made, not when this module is imported.
+'''
+
+MARGIN_PLOTS = (("shear_buckling", "Shear stress MS"), ("compressive_buckling", "Compression buckling MS"),
+                ("tensile", "Tensile stress MS"), ("crack", "Crack propagation MS"))
+
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def plot_margins(model, ylim=(0, 5)):
+    """Margins of safety along the span, one subplot per failure mode."""
+    plt = _pyplot()
+    fig = plt.figure()
+    mg = model.margins
+    for i, (mode, label) in enumerate(MARGIN_PLOTS):
+        ax = fig.add_subplot(221 + i)
+        ax.plot(model.y, getattr(mg, mode), "r" if mode == "crack" else None)
+        ax.set_ylim(*ylim)
+        ax.set_ylabel(label)
+        ax.set_xlabel("Span [m]")
+    return fig
+
+
+def plot_deflection(model):
+    """Deflection, slope and bending moment along the span."""
+    plt = _pyplot()
+    fig = plt.figure()
+    dvdy, v = model.deflection
+    for i, (values, label) in enumerate(((v, "Deflection [m]"), (dvdy, "Slope [-]"), (model.loads[0], "Moment [Nm]"))):
+        ax = fig.add_subplot(221 + i)
+        ax.plot(model.y, values)
+        ax.set_ylabel(label)
+        ax.set_xlabel("Span [m]")
+    return fig
+
+
+def show():
+    _pyplot().show()
@@ -0,0 +1,217 @@
+''' Instrumentation of the pipeline: wall time, call counts and peak memory per stage and hot function
+
+Off by default, and then free: `stage()` hands out one shared no-op context manager and
+the functions marked with `@hot` are left untouched. Switch it on with enable() (or the
+profile() context manager), or for a whole process with the environment variables
+
+    WINGBOX_PROFILE=1                   record wall time and call counts
+    WINGBOX_PROFILE=memory              also record the peak memory per stage (tracemalloc)
+    WINGBOX_PROFILE_REPORT=report.json  write the report at exit
+
+While enabled, the hot functions are replaced by timing wrappers in their module or class,
+so the calls between the wingbox modules are counted too.
+'''
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+_enabled = False
+_memory = False
+_registry = {}          # name -> (module name, qualname, original function)
+_stages = {}            # name -> Record
+_functions = {}         # name -> Record
+_memory_stack = []      # [traced memory at entry, highest peak seen] per open stage
+_NULL = contextlib.nullcontext()
+
+
+class Record:
+    __slots__ = ("calls", "total", "max", "peak_memory")
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.peak_memory = 0
+
+    def add(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def as_dict(self):
+        out = {"calls": self.calls, "total_s": self.total, "mean_s": self.total / self.calls if self.calls else 0.0,
+               "max_s": self.max}
+        if _memory or self.peak_memory:
+            out["peak_memory_bytes"] = self.peak_memory
+        return out
+
+
+# ------------------------------------Hot functions------------------------------------
+
+def _owner(module_name, qualname):
+    owner = sys.modules[module_name]
+    for part in qualname.split(".")[:-1]:
+        owner = getattr(owner, part)
+    return owner
+
+
+def _wrap(name, func):
+    record = _functions.setdefault(name, Record())
+
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record.add(time.perf_counter() - start)
+
+    timed.__wrapped_original__ = func
+    return timed
+
+
+def hot(func):
+    """Mark a function (or method) whose calls are counted and timed while profiling."""
+    module = func.__module__.rpartition(".")[2]
+    name = "%s.%s" % (module, func.__qualname__)
+    _registry[name] = (func.__module__, func.__qualname__, func)
+    # Functions defined while profiling is on are wrapped straight away
+    return _wrap(name, func) if _enabled else func
+
+
+def _patch(wrap):
+    for name, (module_name, qualname, original) in _registry.items():
+        try:
+            owner = _owner(module_name, qualname)
+        except (KeyError, AttributeError):
+            continue        # Defined while enabled and the owner is still being created
+        setattr(owner, qualname.rpartition(".")[2], _wrap(name, original) if wrap else original)
+
+
+# ------------------------------------Stages------------------------------------
+
+class _Stage:
+    __slots__ = ("record", "start")
+
+    def __init__(self, record):
+        self.record = record
+
+    def __enter__(self):
+        if _memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if _memory_stack:
+                _memory_stack[-1][1] = max(_memory_stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            _memory_stack.append([current, current])
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.record.add(time.perf_counter() - self.start)
+        if _memory and _memory_stack:
+            start, highest = _memory_stack.pop()
+            peak = max(highest, tracemalloc.get_traced_memory()[1])
+            self.record.peak_memory = max(self.record.peak_memory, peak - start)
+            if _memory_stack:
+                _memory_stack[-1][1] = max(_memory_stack[-1][1], peak)
+        return False
+
+
+def stage(name):
+    """Context manager recording one execution of the named pipeline stage."""
+    if not _enabled:
+        return _NULL
+    return _Stage(_stages.setdefault(name, Record()))
+
+
+# ------------------------------------Switching------------------------------------
+
+def enable(memory=False):
+    """Start recording. With memory=True the peak memory per stage is traced as well (slower)."""
+    global _enabled, _memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _memory = memory
+    if not _enabled:
+        _enabled = True
+        _patch(wrap=True)
+
+
+def disable():
+    """Stop recording and restore the original functions. The records are kept."""
+    global _enabled, _memory
+    if _enabled:
+        _enabled = False
+        _patch(wrap=False)
+    if _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memory = False
+    _memory_stack.clear()
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Forget everything recorded so far. The records are zeroed in place: the wrappers of the
+    hot functions (and any open stage) keep a reference to theirs."""
+    for record in (*_stages.values(), *_functions.values()):
+        record.clear()
+
+
+@contextlib.contextmanager
+def profile(memory=False):
+    """Record everything inside the block: `with profile(): ...`"""
+    was_enabled = _enabled
+    enable(memory)
+    try:
+        yield
+    finally:
+        if not was_enabled:
+            disable()
+
+
+# ------------------------------------Report------------------------------------
+
+def report():
+    """Machine-readable report of everything recorded so far."""
+    return {
+        "stages": {name: record.as_dict() for name, record in _stages.items() if record.calls},
+        "functions": {name: record.as_dict() for name, record in _functions.items() if record.calls},
+    }
+
+
+def export(path):
+    """Write the report as JSON."""
+    with open(path, "w") as f:
+        json.dump(report(), f, indent=2, sort_keys=True)
+
+
+def summary():
+    """The report as a table, slowest first."""
+    lines = ["%-40s %8s %12s %12s %12s" % ("", "calls", "total [ms]", "mean [ms]", "peak [kB]")]
+    data = report()
+    for kind in ("stages", "functions"):
+        for name, rec in sorted(data[kind].items(), key=lambda item: -item[1]["total_s"]):
+            peak = rec.get("peak_memory_bytes")
+            lines.append("%-40s %8d %12.3f %12.3f %12s" % (
+                "%s %s" % (kind[:-1], name), rec["calls"], rec["total_s"] * 1000, rec["mean_s"] * 1000,
+                "" if peak is None else "%.1f" % (peak / 1024)))
+    return "\n".join(lines)
+
+
+_setting = os.environ.get("WINGBOX_PROFILE", "").strip().lower()
+if _setting not in ("", "0", "off", "false"):
+    enable(memory=_setting == "memory")
+    if os.environ.get("WINGBOX_PROFILE_REPORT"):
+        atexit.register(export, os.environ["WINGBOX_PROFILE_REPORT"])
@@ -0,0 +1,236 @@
+''' Multi-fidelity screening: the four-plate thin wall model first, the full model only for survivors
+
+The cheap model is the section of "Tensile stress and crack propagation": a trapezoid
+of four plates (top sheet, rear spar, slanted bottom sheet, front spar) with the
+stringers as point areas, at COARSE_STATIONS stations and for a whole batch of
+candidates at once (candidates x stations arrays). It gives the mass, tip deflection,
+twist and the minimum margin of every failure mode with the same formulas as the
+detailed model (top panels as wide as at the root side of their rib bay), but without the
+hat stringer inertia, spar flanges and ribs.
+
+Calibration runs both models on a sample of designs and records, per result, the range
+of the ratio detailed / cheap, widened by a slack. A candidate is only rejected when
+even the most favourable detailed value within that range fails:
+
+    a minimum margin whose upper bound is below 1 (clearly infeasible),
+    a tip deflection whose lower bound exceeds max_deflection [%span],
+    a mass whose lower bound exceeds max_mass, or, with lightest=True, the mass of
+    the lightest feasible design analysed so far (clearly heavy).
+
+The survivors go through WingBoxModel:
+
+    calibration = calibrate(sample_designs)
+    for design, stats, stage in screen_designs(load_designs("candidates.jsonl"), calibration, lightest=True):
+        ...     # stage "analysed" (full results) or "rejected" (calibrated cheap estimate)
+'''
+import json
+import math
+from dataclasses import asdict, dataclass
+from itertools import islice
+
+import numpy as np
+
+from wingbox import loads, margins
+from wingbox.model import WingBoxModel, shared_loads
+from wingbox.profiling import hot, stage
+
+COARSE_STATIONS = 40
+QUANTITIES = ("mass", "v_percentage", "phi_max") + tuple("min_" + mode for mode in margins.Margins.MODES)
+MARGINS = QUANTITIES[3:]
+
+
+# ------------------------------------Four-plate model------------------------------------
+
+def _candidate_table(designs, fractions):
+    """Per candidate (rows) the geometry and design properties the cheap model needs."""
+    columns = {}
+    rows = []
+    for design in designs:
+        planform, mat, stringer = design.planform, design.material, design.stringer
+        half_span = planform.half_span
+        y = fractions * half_span
+        bay = np.minimum((y / design.ai_ribs).astype(int), design.n_rectangles - 1)
+        rows.append(dict(
+            y=y, chord=planform.chord(y), x_spars=planform.x_rearspar - planform.x_frontspar,
+            bay_width=margins.top_panel_widths(design)[bay], h_front=planform.h_frontspar,
+            h_rear=planform.h_rearspar, span=planform.b,
+            t_spar=design.t_sheet_spar(y, half_span), t_top=design.t_sheet_hor_top(y, half_span),
+            t_bot=design.t_sheet_hor_bottom(y, half_span), n_top=design.stringers_top.count(y, half_span),
+            n_bot=design.stringers_bot.count(y, half_span), A_str=stringer.area, z_str=stringer.z_na,
+            E=mat.E, G=mat.G, rho=mat.rho, nu=mat.poisson_ratio, sigma_yield=mat.sigma_yield,
+            sigma_crack=margins.sigma_crack(design), column_crit=margins.column_crit(design), ks=design.ks,
+            kc=design.kc))
+    for key in rows[0]:
+        values = np.array([row[key] for row in rows], dtype=float)
+        columns[key] = values if values.ndim == 2 else values[:, None]
+    return columns
+
+
+def _integral(f, y):
+    """Running trapezoid integral of f along the stations (zero at the root)."""
+    out = np.zeros_like(f)
+    out[:, 1:] = np.cumsum((f[:, 1:] + f[:, :-1]) / 2 * np.diff(y, axis=1), axis=1)
+    return out
+
+
+@hot
+def four_plate(designs, points=500, load_case=loads.LoadCase(), stations=COARSE_STATIONS):
+    """Cheap estimates of QUANTITIES for a batch of designs, a dict of arrays (one value per design)."""
+    index = np.unique(np.linspace(0, points - 1, stations).round().astype(int))
+    M, V, T = (a[index] for a in shared_loads(points, load_case))
+    c = _candidate_table(designs, index / points)
+
+    # Plates: I top sheet, II rear spar, III slanted bottom sheet, IV front spar
+    chord = c["chord"]
+    L_I, L_II, L_IV = c["x_spars"] * chord, c["h_rear"] * chord, c["h_front"] * chord
+    L_III = np.sqrt((L_IV - L_II) ** 2 + L_I ** 2)
+    A_I, A_II, A_III, A_IV = L_I * c["t_top"], L_II * c["t_spar"], L_III * c["t_bot"], L_IV * c["t_spar"]
+    z_I, z_II, z_III, z_IV = L_IV, L_IV - L_II / 2, (L_IV - L_II) / 2, L_IV / 2
+    A_top, A_bot = c["n_top"] * c["A_str"], c["n_bot"] * c["A_str"]
+
+    area = A_I + A_II + A_III + A_IV + A_top + A_bot
+    z_n = (A_I * z_I + A_II * z_II + A_III * z_III + A_IV * z_IV + A_top * z_I + A_bot * z_III) / area
+    theta = np.arctan((L_IV - L_II) / L_I)
+    I = (A_I * (z_I - z_n) ** 2 + c["t_spar"] * L_II ** 3 / 12 + A_II * (z_II - z_n) ** 2
+         + c["t_bot"] * L_III ** 3 / 12 * np.sin(theta) ** 2 + A_III * (z_III - z_n) ** 2
+         + c["t_spar"] * L_IV ** 3 / 12 + A_IV * (z_IV - z_n) ** 2
+         + A_top * (z_I - z_n) ** 2 + A_bot * (z_III - z_n) ** 2)
+    enclosed = L_I * (L_II + L_IV) / 2
+    J = 4 * enclosed ** 2 / (L_I / c["t_top"] + L_III / c["t_bot"] + (L_II + L_IV) / c["t_spar"])
+
+    # Stresses at the top sheet, the bottom sheet and the top stringers
+    sigma_top = np.abs(M * (z_I - z_n) / I)
+    sigma_bot = M * (z_III - z_n) / I                                   # Signed, tension for positive n
+    sigma_str = np.abs(M * (z_I - z_n - c["z_str"]) / I)
+    tau = np.abs(3 * V / (4 * L_IV * c["t_spar"]) + T / (2 * enclosed * c["t_spar"]))
+
+    plate = math.pi ** 2 * c["E"] / (12 * (1 - c["nu"] ** 2))
+    result = {
+        "min_shear_buckling": plate * c["ks"] * (c["t_spar"] / L_IV) ** 2 / tau,
+        "min_compressive_buckling": plate * c["kc"] * (c["t_top"] / c["bay_width"]) ** 2 / sigma_top,
+        "min_tensile": c["sigma_yield"] / np.abs(sigma_bot),
+        "min_crack": c["sigma_crack"] / sigma_bot,
+        "min_column_buckling": c["column_crit"] / sigma_str,
+    }
+    result = {key: value.min(axis=1) for key, value in result.items()}
+
+    y = c["y"]
+    v = _integral(_integral(M / (c["E"] * I), y), y)
+    result["v_percentage"] = np.abs(v).max(axis=1) / c["span"][:, 0] * 100
+    result["phi_max"] = np.degrees(np.abs(_integral(T / (c["G"] * J), y)).max(axis=1))
+    result["mass"] = 2 * c["rho"][:, 0] * _integral(area, y)[:, -1]
+    return result
+
+
+# ------------------------------------Calibration------------------------------------
+
+@dataclass(frozen=True)
+class Calibration:
+    """Range of log(detailed / cheap) per quantity, widened by the slack, and the sample it came from."""
+    low: dict
+    high: dict
+    center: dict
+    samples: int
+    points: int
+
+    def bounds(self, cheap):
+        """Lower and upper bounds of the detailed results for cheap estimates (dicts of arrays)."""
+        return ({key: cheap[key] * math.exp(self.low[key]) for key in QUANTITIES},
+                {key: cheap[key] * math.exp(self.high[key]) for key in QUANTITIES})
+
+    def estimate(self, cheap):
+        """Cheap estimates corrected by the typical ratio."""
+        return {key: cheap[key] * math.exp(self.center[key]) for key in QUANTITIES}
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(asdict(self), f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def calibrate(designs, points=500, load_case=loads.LoadCase(), slack=0.1):
+    """Calibration of the four-plate model against WingBoxModel on a sample of designs.
+
+    `slack` widens the observed log ratio range on both sides, for candidates somewhat
+    outside the sample.
+    """
+    designs = list(designs)
+    if len(designs) < 2:
+        raise ValueError("need at least two designs to calibrate on")
+    with stage("screening calibration"):
+        cheap = four_plate(designs, points, load_case)
+        detailed = [WingBoxModel(design, points, load_case).summary() for design in designs]
+    ratio = {key: np.log(np.array([d[key] for d in detailed]) / cheap[key]) for key in QUANTITIES}
+    return Calibration(low={key: float(r.min() - slack) for key, r in ratio.items()},
+                       high={key: float(r.max() + slack) for key, r in ratio.items()},
+                       center={key: float(np.median(r)) for key, r in ratio.items()},
+                       samples=len(designs), points=points)
+
+
+# ------------------------------------Screening------------------------------------
+
+def rejections(lower, upper, max_mass=None, max_deflection=None):
+    """Reason for rejecting every candidate ("" for a survivor) from the bounds of its results."""
+    reasons = np.full(len(lower["mass"]), "", dtype=object)
+    for key in MARGINS:
+        reasons[(reasons == "") & (upper[key] < 1)] = "infeasible: " + key[4:]
+    if max_deflection is not None:
+        reasons[(reasons == "") & (lower["v_percentage"] > max_deflection)] = "infeasible: deflection"
+    if max_mass is not None:
+        reasons[(reasons == "") & (lower["mass"] > max_mass)] = "heavy"
+    return reasons
+
+
+def _summary(estimate, i, span):
+    """Estimate of candidate i with the keys of WingBoxModel.summary()."""
+    out = {"mass": float(estimate["mass"][i]), "v_max": float(estimate["v_percentage"][i]) * span / 100,
+           "v_percentage": float(estimate["v_percentage"][i]), "phi_max": float(estimate["phi_max"][i])}
+    out.update((key, float(estimate[key][i])) for key in MARGINS)
+    return out
+
+
+def feasible(summary, max_deflection=None):
+    """All minimum margins at least 1 and (with a limit) the tip deflection below it."""
+    return all(summary[key] >= 1 for key in MARGINS) and (max_deflection is None or
+                                                          summary["v_percentage"] < max_deflection)
+
+
+def screen_designs(designs, calibration, max_mass=None, max_deflection=None, lightest=False, points=None,
+                   load_case=loads.LoadCase(), batch=1024):
+    """Stream (design, summary, stage) for every candidate: stage "analysed" with the full results, or
+    "rejected: <reason>" with the calibrated four-plate estimate.
+
+    With `lightest` the mass of the lightest feasible design analysed so far is an extra mass
+    limit; the candidates of a batch are then streamed lightest (mass lower bound) first so that
+    limit drops quickly.
+    """
+    if points is not None and points != calibration.points:
+        raise ValueError("the calibration is for %d stations, not %d" % (calibration.points, points))
+    points = calibration.points
+    shared_loads(points, load_case)
+    designs = iter(designs)
+    best = math.inf
+    while True:
+        chunk = list(islice(designs, batch))
+        if not chunk:
+            return
+        with stage("screening four-plate"):
+            cheap = four_plate(chunk, points, load_case)
+            lower, upper = calibration.bounds(cheap)
+            estimate = calibration.estimate(cheap)
+            reasons = rejections(lower, upper, max_mass, max_deflection)
+        order = np.argsort(lower["mass"], kind="stable") if lightest else range(len(chunk))
+        for i in order:
+            if not reasons[i] and lightest and lower["mass"][i] > best:
+                reasons[i] = "heavy"
+            if reasons[i]:
+                yield chunk[i], _summary(estimate, i, chunk[i].planform.b), "rejected: " + reasons[i]
+                continue
+            summary = WingBoxModel(chunk[i], points, load_case).summary()
+            if lightest and feasible(summary, max_deflection):
+                best = min(best, summary["mass"])
+            yield chunk[i], summary, "analysed"
@@ -0,0 +1,113 @@
+''' Section properties of the wing box: neutral axis, moment of inertia, area and torsional constant'''
+from dataclasses import dataclass
+
+import numpy as np
+
+from wingbox.profiling import hot
+
+
+@dataclass(frozen=True)
+class Section:
+    """Section properties along the span, one entry per station."""
+    y: np.ndarray               # Span position [m]
+    h_spar: np.ndarray          # Spar height [m]
+    w_sheet: np.ndarray         # Sheet width [m]
+    t_spar: np.ndarray          # Spar thickness [m]
+    t_top: np.ndarray           # Top sheet thickness [m]
+    t_bot: np.ndarray           # Bottom sheet thickness [m]
+    n_top: np.ndarray           # Number of top stringers [-]
+    n_bot: np.ndarray           # Number of bottom stringers [-]
+    ixx: np.ndarray             # Moment of inertia [m^4]
+    z_na: np.ndarray            # Neutral axis from the bottom sheet [m]
+    area: np.ndarray            # Cross-sectional area [m^2]
+    Am: np.ndarray              # Enclosed area [m^2]
+    J: np.ndarray               # Torsional constant [m^4]
+
+
+@hot
+def box_properties(h_spar, w_sheet, t_spar, t_top, t_bot, n_top, n_bot, w_sides_spar, A_str, z_NA_stringer,
+                   Ixx_stringer):
+    """Neutral axis, moment of inertia, area and torsional constant of the box.
+
+    All arguments broadcast against each other, so the thicknesses may carry
+    extra leading axes (e.g. samples x stations).
+    Returns (Ixx, z_NA, Area, J).
+    """
+    # Neutral axis (Using thin wall assumption)
+    Area = t_top * w_sheet + t_bot * w_sheet + 2 * h_spar * t_spar + 4 * t_spar * w_sides_spar \
+        + (n_bot + n_top) * A_str
+    z_NA = (2 * (t_spar * h_spar * h_spar / 2) + n_bot * A_str * z_NA_stringer
+            + n_top * A_str * (h_spar - z_NA_stringer) + w_sheet * t_top * h_spar) / Area
+
+    # Moment of inertia of each part
+    Ixx_top_sheet = 1 / 12 * w_sheet * t_top ** 3 + w_sheet * t_top * (h_spar - z_NA) ** 2
+    Ixx_bottom_sheet = 1 / 12 * w_sheet * t_bot ** 3 + w_sheet * t_bot * z_NA ** 2
+
+    A_side_spar = 2 * w_sides_spar * t_spar
+    Ixx_mainspar = 1 / 12 * t_spar * h_spar ** 3 + h_spar * t_spar * (h_spar - z_NA) ** 2
+    Ixx_sidespar_top = 1 / 12 * w_sides_spar * t_spar ** 3 + A_side_spar * (h_spar - z_NA) ** 2
+    Ixx_sidespar_bot = 1 / 12 * w_sides_spar * t_spar ** 3 + A_side_spar * z_NA ** 2
+    Ixx_spar = Ixx_mainspar + Ixx_sidespar_top + Ixx_sidespar_bot
+
+    Ixx_top_stringers = n_top * (Ixx_stringer + A_str * (h_spar - z_NA - z_NA_stringer) ** 2)
+    Ixx_bottom_stringers = n_bot * (Ixx_stringer + A_str * (z_NA - z_NA_stringer) ** 2)
+
+    # Total moment of inertia of the wing box
+    Ixx = Ixx_top_sheet + Ixx_bottom_sheet + 2 * Ixx_spar + Ixx_top_stringers + Ixx_bottom_stringers
+
+    # Torsional constant (integral of the reciprocal of t and length)
+    ds_t = 2 * h_spar / t_spar + w_sheet / t_top + w_sheet / t_bot
+    J = 4 * (h_spar * w_sheet) ** 2 / ds_t
+
+    return Ixx, z_NA, Area, J
+
+
+@hot
+def section_properties(design, y):
+    """Section properties of `design` at span positions y."""
+    y = np.asarray(y, dtype=float)
+    planform = design.planform
+    half_span = planform.half_span
+    stringer = design.stringer
+
+    h_spar = planform.height_spar(y)
+    w_sheet = planform.width_sheet(y)
+    t_spar = design.t_sheet_spar(y, half_span)
+    t_top = design.t_sheet_hor_top(y, half_span)
+    t_bot = design.t_sheet_hor_bottom(y, half_span)
+    n_top = design.stringers_top.count(y, half_span)
+    n_bot = design.stringers_bot.count(y, half_span)
+
+    ixx, z_na, area, J = box_properties(h_spar, w_sheet, t_spar, t_top, t_bot, n_top, n_bot, design.w_sides_spar,
+                                        stringer.area, stringer.z_na, stringer.ixx)
+    return Section(y=y, h_spar=h_spar, w_sheet=w_sheet, t_spar=t_spar, t_top=t_top, t_bot=t_bot, n_top=n_top,
+                   n_bot=n_bot, ixx=ixx, z_na=z_na, area=area, Am=h_spar * w_sheet, J=J)
+
+
+# ------------------Calculating the wing box mass -------------------------------------------------------------
+
+# Three point Gauss-Legendre rule, exact for the (piecewise quadratic) cross-sectional area
+_GAUSS_X, _GAUSS_W = np.polynomial.legendre.leggauss(3)
+
+
+@hot
+def wing_box_mass(design):
+    """Wing box mass (2 * mass of half wing + rib mass) [kg].
+
+    The area is integrated exactly between the span positions where the
+    thickness schedules or the stringer layout change.
+    """
+    planform = design.planform
+    edges = np.array([0.0] + design.boundaries() + [planform.half_span])
+    left, right = edges[:-1, None], edges[1:, None]
+    y = (left + right) / 2 + (right - left) / 2 * _GAUSS_X
+    # The Gauss points lie inside the intervals, so the closed side of the schedules does not matter
+    area = section_properties(design, y).area
+    half_wing_volume = np.sum((right - left)[:, 0] / 2 * (area @ _GAUSS_W))
+
+    # Number and geometry of ribs
+    n_ribs = design.n_rectangles + 1
+    y_rib = np.arange(n_ribs) * design.ai_ribs
+    rib_volume = np.sum(planform.enclosed_area(y_rib) * design.rib_thickness)
+
+    return 2 * design.material.rho * half_wing_volume + rib_volume * design.material.rho
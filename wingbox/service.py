@@ -0,0 +1,223 @@
+''' Local analysis service: a long running process that keeps the loads and results warm
+
+Started with `python -m wingbox --serve`, it answers design evaluation requests over
+HTTP on localhost without paying the start-up, import and load table costs per query:
+
+    POST /evaluate   {"designs": [<design description>, ...], "points": 500, "spanwise": false}
+                     -> {"results": [{"name": ..., "summary": {...}, "failures": {...}}, ...]}
+    GET  /health     -> {"status": "ok", "points": 500, "workers": 4, "pending": 0, ...}
+
+The descriptions are those of the design files (wingbox.designfile), except that "base"
+may only name a preset or hold a description: the service never opens files. The designs
+of a batch are evaluated by a bounded pool of worker threads that share the cached loads
+(model.shared_loads). Identical designs are coalesced: a design that is already being
+evaluated waits for that evaluation instead of starting another one, and the summaries
+of recent results are kept in a small cache (spanwise results are not, they are large).
+A request of more than MAX_BATCH designs is answered with 413, one with more than
+MAX_POINTS stations with 400, and when more designs are pending than the service
+accepts, it answers 503 instead of queueing without bound.
+
+    from wingbox.service import evaluate_remote
+    evaluate_remote([{"base": "FinalDesignFile", "w_sides_spar": 0.04}])
+'''
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from wingbox import loads
+from wingbox.designfile import DesignError, design_from_dict, design_to_dict
+from wingbox.model import WingBoxModel, shared_loads
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BATCH = 10000               # Designs per request
+MAX_PENDING = 20000             # Designs waiting for or in evaluation, over all requests
+MAX_POINTS = 50000              # Stations per design
+CACHE_SIZE = 4096               # Recent results without spanwise arrays, per (design without its name, points)
+
+
+class Busy(Exception):
+    """More designs pending than the service accepts."""
+
+
+class AnalysisService:
+    """Evaluates designs on a bounded thread pool, coalescing identical requests."""
+
+    def __init__(self, points=500, load_case=loads.LoadCase(), workers=4, max_pending=MAX_PENDING,
+                 cache_size=CACHE_SIZE):
+        self.points = points
+        self.load_case = load_case
+        self.workers = workers
+        self.max_pending = max_pending
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(workers, thread_name_prefix="wingbox")
+        self._lock = threading.RLock()  # Reentrant: a done callback may run inside submit()
+        self._in_flight = {}            # key -> Future of the evaluation
+        self._cache = OrderedDict()     # key -> result, least recently used first
+        self.counters = {"requests": 0, "designs": 0, "evaluated": 0, "coalesced": 0, "from_cache": 0}
+        shared_loads(points, load_case)
+
+    def _evaluate(self, design, points, spanwise):
+        model = WingBoxModel(design, points, self.load_case)
+        result = {"name": design.name, "summary": model.summary(), "failures": model.margins.failures()}
+        if spanwise:
+            result["spanwise"] = {key: value.tolist() for key, value in model.results().items()
+                                  if isinstance(value, np.ndarray)}
+        return result
+
+    def _done(self, key, future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if future.exception() is None and not key[2]:     # Spanwise results are too large to keep
+                self._cache[key] = future.result()
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    def submit(self, designs, points=None, spanwise=False):
+        """Futures of the results of `designs` (WingBoxDesign objects), raises Busy when full.
+
+        Designs that only differ in name share one evaluation, so a result may carry the name
+        of another design (evaluate() puts the requested names back).
+        """
+        points = points or self.points
+        futures = []
+        with self._lock:
+            if len(self._in_flight) + len(designs) > self.max_pending:
+                raise Busy("%d designs pending, %d more requested" % (len(self._in_flight), len(designs)))
+            self.counters["requests"] += 1
+            self.counters["designs"] += len(designs)
+            for design in designs:
+                description = design_to_dict(design)
+                del description["name"]         # Results do not depend on it; evaluate() sets it per request
+                key = (json.dumps(description, sort_keys=True), points, spanwise)
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    futures.append(self._cache[key])
+                    self.counters["from_cache"] += 1
+                elif key in self._in_flight:
+                    futures.append(self._in_flight[key])
+                    self.counters["coalesced"] += 1
+                else:
+                    future = self._pool.submit(self._evaluate, design, points, spanwise)
+                    self._in_flight[key] = future
+                    future.add_done_callback(lambda f, key=key: self._done(key, f))
+                    futures.append(future)
+                    self.counters["evaluated"] += 1
+        return futures
+
+    def evaluate(self, descriptions, points=None, spanwise=False):
+        """Results of a batch of design descriptions, in order. Raises DesignError or Busy."""
+        designs = []
+        for i, description in enumerate(descriptions):
+            try:
+                designs.append(design_from_dict(description, allow_files=False))
+            except DesignError as e:
+                raise DesignError("designs[%d]: %s" % (i, e)) from None
+        futures = self.submit(designs, points, spanwise)
+        results = []
+        for design, future in zip(designs, futures):
+            result = future if isinstance(future, dict) else future.result()
+            results.append(dict(result, name=design.name))
+        return results
+
+    def status(self):
+        with self._lock:
+            return dict(status="ok", points=self.points, workers=self.workers, pending=len(self._in_flight),
+                        cached=len(self._cache), **self.counters)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+# ------------------------------------HTTP------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "wingbox"
+
+    def _reply(self, code, body):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._reply(200, self.server.service.status())
+        else:
+            self._reply(404, {"error": "unknown path %s" % self.path})
+
+    def do_POST(self):
+        if self.path != "/evaluate":
+            self._reply(404, {"error": "unknown path %s" % self.path})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            designs = request["designs"] if isinstance(request, dict) else request
+            if not isinstance(designs, list):
+                raise DesignError("designs: expected a list of design descriptions")
+            if len(designs) > MAX_BATCH:
+                self._reply(413, {"error": "at most %d designs per request" % MAX_BATCH})
+                return
+            options = request if isinstance(request, dict) else {}
+            points = options.get("points")
+            if points is not None and not (isinstance(points, int) and 1 < points <= MAX_POINTS):
+                raise DesignError("points: expected an integer from 2 to %d, got %r" % (MAX_POINTS, points))
+            results = self.server.service.evaluate(designs, points, bool(options.get("spanwise", False)))
+        except (DesignError, KeyError, json.JSONDecodeError) as e:
+            self._reply(400, {"error": str(e) if not isinstance(e, KeyError) else "missing field %s" % e})
+        except Busy as e:
+            self._reply(503, {"error": str(e)})
+        except Exception as e:                  # A failing evaluation must not take the connection down
+            self._reply(500, {"error": "%s: %s" % (type(e).__name__, e)})
+        else:
+            self._reply(200, {"results": results})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(service, host=HOST, port=PORT, verbose=False):
+    """HTTP server answering for `service` (port 0: any free port, see server.server_address)."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def serve(host=HOST, port=PORT, points=500, workers=4, verbose=False):
+    """Run the service until interrupted."""
+    service = AnalysisService(points, workers=workers)
+    server = make_server(service, host, port, verbose)
+    print("wingbox service on http://%s:%d (%d workers, %d stations)" % (*server.server_address[:2], workers,
+                                                                        points))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def evaluate_remote(descriptions, url="http://%s:%d" % (HOST, PORT), points=None, spanwise=False, timeout=60):
+    """Evaluate design descriptions with a running service; the list of results."""
+    from urllib.error import HTTPError
+    from urllib.request import Request, urlopen
+    body = {"designs": list(descriptions), "spanwise": spanwise}
+    if points is not None:
+        body["points"] = points
+    request = Request(url.rstrip("/") + "/evaluate", json.dumps(body).encode(),
+                      {"Content-Type": "application/json"})
+    try:
+        with urlopen(request, timeout=timeout) as response:
+            return json.load(response)["results"]
+    except HTTPError as e:
+        raise RuntimeError("service answered %d: %s" % (e.code, json.load(e).get("error"))) from None
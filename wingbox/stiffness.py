@@ -0,0 +1,30 @@
+''' Bending and torsional stiffness, deflection and twist of the wing box'''
+import numpy as np
+
+from wingbox.profiling import hot
+
+
+def _running_sum(a):
+    """sum(a[:n]) for every n (zero at the root), along the last axis."""
+    out = np.zeros_like(a)
+    np.cumsum(a[..., :-1], axis=-1, out=out[..., 1:])
+    return out
+
+
+@hot
+def deflection(M, E, ixx, dy):
+    """Slope and deflection from the rectangle rule integration of M/EI.
+
+    Both integration constants follow from dv/dy(0) = 0 and v(0) = 0.
+    Returns (dvdy, v) per station.
+    """
+    MEI = M / (E * ixx)
+    dvdy = _running_sum(MEI * dy)
+    v = _running_sum(dvdy * dy)
+    return dvdy, v
+
+
+@hot
+def twist(T, G, J, dy):
+    """Twist [rad] from the rectangle rule integration of T/GJ, with phi(0) = 0."""
+    return _running_sum(T / (G * J) * dy)
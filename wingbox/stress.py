@@ -0,0 +1,27 @@
+''' Stresses in the wing box from the internal moment, shear and torsion'''
+import numpy as np
+
+
+# Actual shear stress in the spars
+def shear_stress(V, T, section):
+    return np.abs(3 * V / (4 * section.h_spar * section.t_spar) + T / (2 * section.Am * section.t_spar))
+
+
+# Bending stress in the top sheet (compression for positive n)
+def compressive_stress(M, section):
+    return np.abs(M * (section.h_spar - section.z_na) / section.ixx)
+
+
+# Bending stress in the bottom sheet (tension for positive n)
+def tensile_stress(M, section):
+    return np.abs(M * section.z_na / section.ixx)
+
+
+# Signed bending stress in the bottom sheet, used for crack propagation
+def bottom_stress(M, section):
+    return M * -section.z_na / section.ixx
+
+
+# Bending stress at the centroid of the top stringers
+def stringer_stress(M, section, z_NA_stringer):
+    return np.abs(M * (section.h_spar - section.z_na - z_NA_stringer) / section.ixx)
@@ -0,0 +1,270 @@
+''' Surrogate model of the design evaluation, trained on sweep results, for instant trade studies
+
+A Gaussian process regression per result (mass, v_max, phi_max and the minimum margin
+of every failure mode) on a fixed length description of the design: the sheet
+thicknesses and stringer counts at FEATURE_STATIONS along the span, the hat stringer,
+the material and the scalar design parameters. The results are modelled as their
+logarithm (all of them are positive ratios or sizes), a linear trend plus a correlated
+residual, so the predicted standard deviation is a relative uncertainty.
+
+The trend is fitted on the leading principal components of the features, at most one per
+TREND_SAMPLES training designs, and its uncertainty is part of the predicted one
+(universal kriging), so a small training set does not give a falsely certain
+interpolation. The kernel length scale and noise are shared by all results (chosen by the
+summed restricted likelihood), and the signal variance is raised where the leave-one-out
+errors of the training designs are larger than it predicts. While the training designs do
+not span more than the feature space (samples <= rank + 1) every standard deviation is
+infinite. A prediction for any number of candidates is one kernel matrix and a few matrix
+products. screen() trusts the prediction of a candidate only when it is certain enough
+and no margin could be on the other side of 1; the others go to the full solver:
+
+    surrogate = Surrogate.fit(designs, summaries)       # e.g. from python -m wingbox --sweep
+    surrogate.save("surrogate.npz")
+    for design, stats, source in screen(load_designs("candidates.jsonl"), surrogate):
+        ...
+'''
+import csv
+import math
+from dataclasses import dataclass
+from itertools import islice
+
+import numpy as np
+
+from wingbox import loads
+from wingbox.margins import Margins
+from wingbox.model import WingBoxModel, shared_loads
+from wingbox.profiling import hot, stage
+
+TARGETS = ("mass", "v_max", "phi_max") + tuple("min_" + mode for mode in Margins.MODES)
+SOLVED = ("solver", "analysed")                 # Sources of full model results in a sweep table
+FEATURE_STATIONS = np.linspace(0, 1, 26)        # Where thicknesses and stringer counts are taken [%span]
+
+LENGTH_SCALES = (0.25, 0.5, 1, 2, 4)            # Candidate length scales, times the median distance
+NOISE_RATIOS = (1e-8, 1e-6, 1e-4, 1e-2)         # Candidate noise variances, relative to the signal variance
+TREND_SAMPLES = 4                               # Training designs per trend coefficient
+RANK_TOLERANCE = 1e-6                           # Singular values below this (relative) do not count
+
+
+# ------------------------------------Features------------------------------------
+
+def design_features(design):
+    """Fixed length vector of numbers describing `design`."""
+    planform = design.planform
+    y = FEATURE_STATIONS * planform.half_span
+    mat, stringer = design.material, design.stringer
+    return np.concatenate([
+        design.t_sheet_spar(y, planform.half_span),
+        design.t_sheet_hor_top(y, planform.half_span),
+        design.t_sheet_hor_bottom(y, planform.half_span),
+        design.stringers_top.count(y, planform.half_span),
+        design.stringers_bot.count(y, planform.half_span),
+        [stringer.t_stringer, stringer.h_stringer, stringer.w_sides_stringer, stringer.w_top_side_stringer,
+         stringer.area, stringer.ixx, stringer.z_na],
+        [mat.E, mat.G, mat.rho, mat.poisson_ratio, mat.sigma_yield, mat.k1c],
+        [design.w_sides_spar, design.ai_ribs, design.rib_thickness, design.ks, design.kc, design.cracksize],
+    ])
+
+
+def features(designs):
+    """Feature matrix, designs x features."""
+    return np.array([design_features(d) for d in designs], dtype=float)
+
+
+def _distances(a, b):
+    """Squared euclidean distances between the rows of a and b."""
+    d = np.sum(a ** 2, axis=1)[:, None] + np.sum(b ** 2, axis=1)[None, :] - 2 * a @ b.T
+    return np.maximum(d, 0)
+
+
+def _trend(x, basis):
+    """Trend regressors: a constant and the principal components in `basis` (components x features)."""
+    return np.hstack([np.ones((len(x), 1)), x @ basis.T])
+
+
+# ------------------------------------Model------------------------------------
+
+@dataclass(frozen=True)
+class Surrogate:
+    """Gaussian process regression of the log results with a principal component trend."""
+    center: np.ndarray          # Feature means
+    scale: np.ndarray           # Feature standard deviations (1 for constant features)
+    x: np.ndarray               # Standardised training features, samples x features
+    basis: np.ndarray           # Principal components in the trend, components x features
+    rank: int                   # Effective rank of the training features
+    length_scale: float
+    noise: float                # Noise variance relative to the signal variance
+    beta: np.ndarray            # Trend coefficients, (1 + components) x targets
+    alpha: np.ndarray           # Weights of the residual, samples x targets
+    variance: np.ndarray        # Signal variance of the log residual per target
+    lower_inverse: np.ndarray   # L^-1, L the Cholesky factor of the training correlation matrix (with noise)
+    whitened_trend: np.ndarray  # L^-1 F, F the trend regressors of the training designs
+    trend_inverse: np.ndarray   # (F' K^-1 F)^-1, the covariance of beta over the signal variance
+
+    @classmethod
+    def fit(cls, designs, results):
+        """Train on evaluated designs; `results` holds a summary (dict with TARGETS) per design."""
+        with stage("surrogate fit"):
+            raw = features(designs)
+            y = np.log(np.array([[r[key] for key in TARGETS] for r in results], dtype=float))
+            if len(raw) != len(y):
+                raise ValueError("got %d designs but %d results" % (len(raw), len(y)))
+            if len(raw) < 2:
+                raise ValueError("need at least two evaluated designs to train on")
+            center, scale = raw.mean(axis=0), raw.std(axis=0)
+            scale[scale == 0] = 1
+            x = (raw - center) / scale
+            n = len(x)
+
+            _, singular, components = np.linalg.svd(x, full_matrices=False)
+            rank = int(np.sum(singular > RANK_TOLERANCE * singular[0])) if singular[0] > 0 else 0
+            basis = components[:min(rank, n // TREND_SAMPLES)]
+            F = _trend(x, basis)
+            p = F.shape[1]
+
+            distances = _distances(x, x)
+            median = math.sqrt(np.median(distances[distances > 0])) if np.any(distances > 0) else 1.0
+            best = None
+            for length in LENGTH_SCALES:
+                correlation = np.exp(-distances / (2 * (length * median) ** 2))
+                for noise in NOISE_RATIOS:
+                    try:
+                        L = np.linalg.cholesky(correlation + noise * np.eye(n))
+                    except np.linalg.LinAlgError:
+                        continue
+                    G, z = np.linalg.solve(L, F), np.linalg.solve(L, y)
+                    try:
+                        R = np.linalg.cholesky(G.T @ G)
+                    except np.linalg.LinAlgError:
+                        continue
+                    beta = np.linalg.solve(R.T, np.linalg.solve(R, G.T @ z))
+                    variance = np.maximum(np.sum((z - G @ beta) ** 2, axis=0) / max(n - p, 1), 1e-300)
+                    # Restricted likelihood with the signal variance at its optimum, summed over the targets
+                    likelihood = (-0.5 * (n - p) * np.sum(np.log(variance))
+                                  - len(TARGETS) * (np.sum(np.log(np.diag(L))) + np.sum(np.log(np.diag(R)))))
+                    if best is None or likelihood > best[0]:
+                        best = (likelihood, length * median, noise, L, beta, variance)
+
+            _, length_scale, noise, L, beta, variance = best
+            lower_inverse = np.linalg.solve(L, np.eye(n))
+            whitened_trend = lower_inverse @ F
+            trend_inverse = np.linalg.inv(whitened_trend.T @ whitened_trend)
+            alpha = lower_inverse.T @ (lower_inverse @ (y - F @ beta))
+
+            # Leave-one-out errors of the training designs, scaled by their predicted deviation. With
+            # Q an orthonormal basis of L^-1 F, the leave-one-out precision is the column norm of
+            # (I - Q Q') L^-1, which stays positive where the explicit inverse would cancel.
+            Q = np.linalg.qr(whitened_trend)[0]
+            free = lower_inverse - Q @ (Q.T @ lower_inverse)
+            precision = np.sum(free ** 2, axis=0)
+            kept = precision > 0
+            loo = alpha[kept] / np.sqrt(precision[kept])[:, None]
+            # The errors have heavier tails than a normal distribution (the minimum margins have kinks
+            # where the critical station moves), so the 99th percentile has to match as well
+            spread = np.maximum(np.mean(loo ** 2, axis=0), (np.quantile(np.abs(loo), 0.99, axis=0) / 2.576) ** 2)
+            variance = np.maximum(variance, spread)
+            return cls(center=center, scale=scale, x=x, basis=basis, rank=rank, length_scale=length_scale,
+                       noise=noise, beta=beta, alpha=alpha, variance=variance, lower_inverse=lower_inverse,
+                       whitened_trend=whitened_trend, trend_inverse=trend_inverse)
+
+    @hot
+    def predict(self, candidates):
+        """Predicted results and their relative standard deviations, two dicts of arrays keyed by TARGETS.
+
+        `candidates` is a list of designs or a feature matrix.
+        """
+        raw = candidates if isinstance(candidates, np.ndarray) else features(candidates)
+        x = (raw - self.center) / self.scale
+        k = np.exp(-_distances(x, self.x) / (2 * self.length_scale ** 2))
+        F = _trend(x, self.basis)
+        log_mean = F @ self.beta + k @ self.alpha
+        # Whitened: k' K^-1 k = |v|^2 without the cancellation of an explicit K^-1
+        v = k @ self.lower_inverse.T
+        trend = F - v @ self.whitened_trend     # Part of the trend the training designs do not pin down
+        correlation = (1 + self.noise - np.einsum("ij,ij->i", v, v)
+                       + np.einsum("ij,ij->i", trend @ self.trend_inverse, trend))
+        log_std = np.sqrt(np.maximum(correlation, self.noise)[:, None] * self.variance[None, :])
+        if self.samples <= self.rank + 1:
+            log_std = np.full_like(log_std, np.inf)
+        mean, std = np.exp(log_mean), log_std
+        return ({key: mean[:, i] for i, key in enumerate(TARGETS)},
+                {key: std[:, i] for i, key in enumerate(TARGETS)})
+
+    @property
+    def samples(self):
+        return len(self.x)
+
+    def save(self, path):
+        np.savez_compressed(path, length_scale=self.length_scale, noise=self.noise, rank=self.rank,
+                            **{name: getattr(self, name) for name in ARRAYS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in ARRAYS}, rank=int(data["rank"]),
+                       length_scale=float(data["length_scale"]), noise=float(data["noise"]))
+
+
+ARRAYS = ("center", "scale", "x", "basis", "beta", "alpha", "variance", "lower_inverse", "whitened_trend",
+          "trend_inverse")
+
+
+# ------------------------------------Training data and screening------------------------------------
+
+def read_results(path):
+    """Results of a sweep as written by python -m wingbox --sweep (tab separated): name -> summary.
+
+    Only the TARGETS columns are read. Rows of a table with a source column (--surrogate,
+    --screen) that are predictions or estimates rather than full model results are left out.
+    """
+    results = {}
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f, delimiter="\t")
+        missing = [key for key in ("name",) + TARGETS if key not in (reader.fieldnames or ())]
+        if missing:
+            raise ValueError("%s: not a sweep results table, missing column(s) %s" % (path, ", ".join(missing)))
+        for row in reader:
+            name = row["name"]
+            if name in results:
+                raise ValueError("%s: design name %r appears more than once" % (path, name))
+            if row.get("source", SOLVED[0]) in SOLVED:
+                results[name] = {key: float(row[key]) for key in TARGETS}
+    return results
+
+
+def _summary(prediction, i, span):
+    out = {key: float(values[i]) for key, values in prediction.items()}
+    ordered = {"mass": out["mass"], "v_max": out["v_max"], "v_percentage": out["v_max"] / span * 100,
+               "phi_max": out["phi_max"]}
+    ordered.update((key, out[key]) for key in TARGETS[3:])
+    return ordered
+
+
+def confident(prediction, std, tolerance=0.05, z=3.0):
+    """Per candidate: all relative standard deviations within `tolerance` and every minimum
+    margin at least z standard deviations away from 1 (so the pass/fail verdict holds)."""
+    sure = np.all([s <= tolerance for s in std.values()], axis=0)
+    for key in TARGETS[3:]:
+        sure &= np.abs(np.log(prediction[key])) >= z * std[key]
+    return sure
+
+
+def screen(designs, surrogate, tolerance=0.05, z=3.0, points=500, load_case=loads.LoadCase(), batch=1024):
+    """Stream (design, summary, source) for every candidate, source "surrogate" or "solver".
+
+    The candidates are predicted in batches; the ones the surrogate is not confident
+    about (see confident()) are evaluated by WingBoxModel instead.
+    """
+    shared_loads(points, load_case)
+    designs = iter(designs)
+    while True:
+        chunk = list(islice(designs, batch))
+        if not chunk:
+            return
+        with stage("surrogate predict"):
+            prediction, std = surrogate.predict(chunk)
+            sure = confident(prediction, std, tolerance, z)
+        for i, design in enumerate(chunk):
+            if sure[i]:
+                yield design, _summary(prediction, i, design.planform.b), "surrogate"
+            else:
+                yield design, WingBoxModel(design, points, load_case).summary(), "solver"